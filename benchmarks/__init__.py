@@ -0,0 +1 @@
+"""Benchmarks of the match scheduler on synthetic seasons of different sizes."""
@@ -0,0 +1,179 @@
+"""Time scoring, optimizer passes and exports over a grid of season sizes.
+
+Run from the repository root, e.g.
+
+    python -m benchmarks --players 5 10 20 40 60 --courts 1 2 4 --output results.json
+    python -m benchmarks --compare results.json --output new.json
+"""
+
+import argparse
+import itertools
+import json
+import logging
+import platform
+import random
+import statistics
+import subprocess
+import tempfile
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Callable
+
+from matchscheduler.optimizer import Optimizer
+from matchscheduler.printer import Printer
+from matchscheduler.scoring_algorithm import (
+    BoundScoringAlgorithm,
+    ScoringAlgorithm,
+    VectorizedScoringAlgorithm,
+)
+from matchscheduler.season import Season
+
+from .synthetic import create_settings
+
+logger = logging.getLogger(__name__)
+
+
+def _time(run: Callable[[Season], object], create_season: Callable[[], Season], repeats: int):
+    # every repeat gets a fresh season, its creation is not timed
+    timings = []
+    for _ in range(repeats):
+        season = create_season()
+        start = time.perf_counter()
+        run(season)
+        timings.append(time.perf_counter() - start)
+    return {
+        "min": min(timings),
+        "median": statistics.median(timings),
+        "mean": statistics.fmean(timings),
+        "repeats": repeats,
+    }
+
+
+def _export(season: Season, export: Callable[[Printer, Path], None]) -> None:
+    with tempfile.TemporaryDirectory() as folder:
+        export(Printer(season), Path(folder))
+
+
+BENCHMARKS: dict[str, Callable[[Season], object]] = {
+    "get_score": lambda s: ScoringAlgorithm().get_score(s.schedule, s.players),
+    "get_score_vectorized": lambda s: VectorizedScoringAlgorithm().get_score(s.schedule, s.players),
+    "get_score_bound": lambda s: BoundScoringAlgorithm(s.players).get_score(s.schedule),
+    "swapping_players_pass": lambda s: Optimizer(s).optimize_schedule_by_swapping_players(0),
+    "swapping_matches_pass": lambda s: Optimizer(s).optimize_schedule_by_swapping_matches(0),
+    "optimize_schedule": lambda s: Optimizer(s).optimize_schedule(),
+    "export_excel": lambda s: _export(s, Printer.export_excel),
+    "export_calendar": lambda s: _export(s, Printer.export_calendar),
+    "export_calendar_fast": lambda s: _export(
+        s, lambda printer, folder: printer.export_calendar(folder, fast=True)
+    ),
+}
+
+
+def run_case(
+    num_players: int,
+    num_courts: int,
+    weeks: int,
+    density: float,
+    repeats: int,
+    seed: int,
+    names: list[str],
+) -> dict:
+    settings = create_settings(num_players, num_courts, weeks, density, seed)
+
+    def create_season() -> Season:
+        random.seed(seed)
+        return Season.create_from_settings(settings)
+
+    timings = {}
+    for name in names:
+        timings[name] = _time(BENCHMARKS[name], create_season, repeats)
+        logger.info(
+            "players=%i courts=%i weeks=%i density=%.2f %s: %.4fs",
+            num_players,
+            num_courts,
+            weeks,
+            density,
+            name,
+            timings[name]["median"],
+        )
+    return {
+        "params": {
+            "players": num_players,
+            "courts": num_courts,
+            "weeks": weeks,
+            "density": density,
+            "seed": seed,
+        },
+        "timings": timings,
+    }
+
+
+def _get_commit() -> str | None:
+    try:
+        result = subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True
+        )
+    except (OSError, subprocess.CalledProcessError):
+        return None
+    return result.stdout.strip()
+
+
+def compare(old: dict, new: dict) -> list[str]:
+    """Get a line with the ratio of the medians new / old for every common timing."""
+    old_cases = {json.dumps(c["params"], sort_keys=True): c["timings"] for c in old["results"]}
+    lines = []
+    for case in new["results"]:
+        old_timings = old_cases.get(json.dumps(case["params"], sort_keys=True))
+        if old_timings is None:
+            continue
+        for name, timing in case["timings"].items():
+            if name in old_timings:
+                ratio = timing["median"] / old_timings[name]["median"]
+                lines.append(f"{case['params']} {name}: {ratio:.2f}x")
+    return lines
+
+
+def main(argv: list[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(
+        description="Time scoring, optimizer passes and exports of synthetic seasons."
+    )
+    parser.add_argument("--players", type=int, nargs="+", default=[5, 10, 20, 40, 60])
+    parser.add_argument("--courts", type=int, nargs="+", default=[1, 2, 4])
+    parser.add_argument("--weeks", type=int, nargs="+", default=[26])
+    parser.add_argument("--density", type=float, nargs="+", default=[0.05])
+    parser.add_argument("--repeats", type=int, default=3)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--only", nargs="+", choices=list(BENCHMARKS), default=list(BENCHMARKS))
+    parser.add_argument("--output", type=Path, default=Path("benchmark_results.json"))
+    parser.add_argument("--compare", type=Path, help="earlier results to compare against")
+    args = parser.parse_args(argv)
+    logging.basicConfig(level=logging.INFO, format="%(message)s")
+    logging.getLogger("matchscheduler").setLevel(logging.WARNING)
+
+    results = []
+    for players, courts, weeks, density in itertools.product(
+        args.players, args.courts, args.weeks, args.density
+    ):
+        if players < 2 * courts:
+            continue
+        results.append(
+            run_case(players, courts, weeks, density, args.repeats, args.seed, args.only)
+        )
+    output = {
+        "metadata": {
+            "commit": _get_commit(),
+            "python": platform.python_version(),
+            "machine": platform.machine(),
+            "timestamp": datetime.now(timezone.utc).isoformat(),
+        },
+        "results": results,
+    }
+    with open(args.output, "w", encoding="utf-8") as f:
+        json.dump(output, f, indent=2)
+    logger.info("Results written to %s", args.output)
+
+    if args.compare is not None:
+        with open(args.compare, "r", encoding="utf-8") as f:
+            for line in compare(json.load(f), output):
+                logger.info(line)
@@ -0,0 +1,39 @@
+"""Generate settings of synthetic seasons."""
+
+import random
+from datetime import date, timedelta
+
+START = date(2024, 1, 1)
+
+
+def create_settings(
+    num_players: int,
+    num_courts: int,
+    weeks: int,
+    cannot_play_density: float = 0.0,
+    seed: int = 0,
+) -> dict:
+    """Create settings like settings.json for a weekly season.
+
+    Every player cannot play on a date with probability cannot_play_density.
+    """
+    rng = random.Random(seed)
+    dates = [START + timedelta(days=7 * i) for i in range(weeks)]
+    return {
+        "calendar": {"title": "Benchmark", "time_start": "19:00", "time_end": "21:00"},
+        "abo": {
+            "start": str(dates[0]),
+            "end": str(dates[-1]),
+            "excluded_dates": [],
+            "overall_cost": 1000,
+            "number_courts": num_courts,
+        },
+        "players": [
+            {
+                "name": f"player{i}",
+                "cannot_play": [str(d) for d in dates if rng.random() < cannot_play_density],
+                "weight": 1,
+            }
+            for i in range(num_players)
+        ],
+    }
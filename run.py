@@ -2,18 +2,12 @@ import json
 import logging
 import logging.config
 import os
+import random
 from pathlib import Path
 
-from joblib import Parallel, delayed
-
-from matchscheduler.optimizer import Optimizer
+from matchscheduler.checkpoint import write_atomic
+from matchscheduler.multi_start_runner import MultiStartRunner
 from matchscheduler.printer import Printer
-from matchscheduler.season import Season
-
-
-def task(optimizer: Optimizer) -> float:
-    return {"score": optimizer.optimize_schedule(), "season": optimizer.season}
-
 
 if __name__ == "__main__":
     logging.config.fileConfig("log.ini")
@@ -22,10 +16,16 @@ if __name__ == "__main__":
     with open("settings.json", "r", encoding="utf-8") as f:
         # load settings.json into data object
         data = json.load(f)
-        seasons = [Optimizer(Season.create_from_settings(data)) for x in range(num_jobs)]
-        results = Parallel(n_jobs=num_jobs)(delayed(task)(s) for s in seasons)
-        best_result = sorted(results, key=lambda x: x["score"])[0]
-        score, s = best_result["score"], best_result["season"]
+        # fresh seeds for every run, logged to reproduce it
+        seeds = [random.SystemRandom().randrange(2**32) for _ in range(num_jobs)]
+        logger.info("Seeds: %s", seeds)
+        runner = MultiStartRunner(data, seeds=seeds, max_workers=num_jobs)
+        score, s = runner.run()
         p = Printer(s)
-        p.export(Path(os.getcwd() + "/output/"))
+        output = Path(os.getcwd() + "/output/")
+        p.export(output, incremental=True)
+        if runner.archive is not None:
+            write_atomic(
+                output / "archive.json", json.dumps(runner.archive.to_dict()).encode("utf-8")
+            )
         logger.info("Current Schedule score is = %.3f", score)
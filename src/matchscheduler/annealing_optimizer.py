@@ -0,0 +1,194 @@
+"""Simulated annealing optimizer using the same moves as the greedy Optimizer."""
+
+import logging
+import math
+import random
+import time
+from typing import Callable
+
+from .incremental_scorer import IncrementalScorer, Move
+from .instrumentation import profile
+from .match import Match, get_players_of_match
+from .scoring_algorithm import BoundScoringAlgorithm
+from .season import Season
+
+# a cooling schedule maps the progress of a run (0 to 1) to a temperature
+CoolingSchedule = Callable[[float], float]
+
+
+def geometric_cooling(start_temperature: float, end_temperature: float) -> CoolingSchedule:
+    def temperature(progress: float) -> float:
+        return start_temperature * (end_temperature / start_temperature) ** progress
+
+    return temperature
+
+
+def linear_cooling(start_temperature: float, end_temperature: float) -> CoolingSchedule:
+    def temperature(progress: float) -> float:
+        return start_temperature + (end_temperature - start_temperature) * progress
+
+    return temperature
+
+
+class AnnealingOptimizer:
+    """Optimize a season by simulated annealing.
+
+    Random moves (change_match, switch_matches, swap_players_of_existing_matches) are
+    accepted if they improve the score or otherwise with probability exp(-delta / T).
+    The run ends when the iteration or time budget is used up and leaves the best schedule
+    seen in the season. trace holds (seconds, current score, best score) of the run.
+    """
+
+    def __init__(
+        self,
+        season: Season,
+        max_iterations: int | None = None,
+        max_seconds: float | None = None,
+        cooling: CoolingSchedule | None = None,
+        rng: random.Random | None = None,
+        trace_interval: int = 1000,
+    ):
+        if max_iterations is None and max_seconds is None:
+            raise ValueError("Either max_iterations or max_seconds has to be given.")
+        self.season = season
+        self.max_iterations = max_iterations
+        self.max_seconds = max_seconds
+        self.cooling = cooling
+        self.rng = rng or random.Random()
+        self.trace_interval = trace_interval
+        self.trace: list[tuple[float, float, float]] = []
+        self.logger = logging.getLogger(__name__)
+        self.scorer = BoundScoringAlgorithm(season.players)
+
+    def _get_free_rounds(self) -> list[int]:
+        return [i for i in range(len(self.season.schedule)) if i not in self.season.fixed_rounds]
+
+    def _try_change_match(self, rounds: list[int]) -> tuple[Move, Callable[[], bool]] | None:
+        round_index = self.rng.choice(rounds)
+        match_index = self.rng.randrange(len(self.season.schedule[round_index]))
+        candidates = self.season.get_candidate_matches(round_index, match_index)
+        if not candidates:
+            return None
+        old_match: Match = self.season.schedule[round_index][match_index]
+        new_match = self.rng.choice(candidates)
+        self.season.change_match(round_index, match_index, new_match)
+        return ((round_index, match_index, new_match),), lambda: self.season.change_match(
+            round_index, match_index, old_match
+        )
+
+    def _try_switch_matches(self, rounds: list[int]) -> tuple[Move, Callable[[], bool]] | None:
+        round1, round2 = self.rng.sample(rounds, 2)
+        match1 = self.rng.randrange(len(self.season.schedule[round1]))
+        match2 = self.rng.randrange(len(self.season.schedule[round2]))
+        if not self.season.switch_matches(round1, match1, round2, match2):
+            return None
+        move = (
+            (round1, match1, self.season.schedule[round1][match1]),
+            (round2, match2, self.season.schedule[round2][match2]),
+        )
+        return move, lambda: self.season.switch_matches(round1, match1, round2, match2)
+
+    def _try_swap_players(
+        self, rounds: list[int], scorer: IncrementalScorer
+    ) -> tuple[Move, Callable[[], bool]] | None:
+        round_index = self.rng.choice(rounds)
+        if len(self.season.schedule[round_index]) < 2:
+            return None
+        match1, match2 = self.rng.sample(self.season.schedule[round_index], 2)
+        p = self.rng.choice(get_players_of_match(match1))
+        q = self.rng.choice(get_players_of_match(match2))
+        self.season.swap_players_of_existing_matches(round_index, p, q)
+        move = scorer.get_move_to(self.season.schedule, [round_index])
+        return move, lambda: self.season.swap_players_of_existing_matches(round_index, p, q)
+
+    def _try_random_move(
+        self, rounds: list[int], scorer: IncrementalScorer
+    ) -> tuple[Move, Callable[[], bool]] | None:
+        kind = self.rng.randrange(3)
+        if kind == 0:
+            return self._try_change_match(rounds)
+        if kind == 1 and len(rounds) > 1:
+            return self._try_switch_matches(rounds)
+        return self._try_swap_players(rounds, scorer)
+
+    def calibrate_start_temperature(self) -> float:
+        """Get a temperature which accepts small worsening moves with p = 0.5.
+
+        Small means the lowest decile of worsening random moves of the current schedule.
+        """
+        rounds = self._get_free_rounds()
+        if not rounds:
+            return 1
+        scorer = IncrementalScorer(self.season.schedule, self.season.players)
+        worsening = []
+        for _ in range(200):
+            tried = self._try_random_move(rounds, scorer)
+            if tried is None:
+                continue
+            move, undo = tried
+            delta = scorer.score_delta(move)
+            undo()
+            if delta > 0:
+                worsening.append(delta)
+        worsening.sort()
+        return (worsening[len(worsening) // 10] if worsening else 1) / math.log(2)
+
+    def _get_progress(self, iteration: int, elapsed: float) -> float:
+        progress = 0.0
+        if self.max_iterations is not None:
+            progress = max(progress, iteration / self.max_iterations)
+        if self.max_seconds is not None:
+            progress = max(progress, elapsed / self.max_seconds)
+        return progress
+
+    @profile
+    def optimize_schedule(self) -> float:
+        """Optimize the schedule for this season."""
+        rounds = self._get_free_rounds()
+        if not rounds:
+            return self.scorer.get_score(self.season.schedule, self.season.players)
+        cooling = self.cooling
+        if cooling is None:
+            start_temperature = self.calibrate_start_temperature()
+            cooling = geometric_cooling(start_temperature, start_temperature / 1000)
+        scorer = IncrementalScorer(self.season.schedule, self.season.players)
+        best_score = scorer.score
+        best_schedule = [list(r) for r in self.season.schedule]
+
+        start_time = time.perf_counter()
+        iteration = 0
+        progress = 0.0
+        while progress < 1:
+            tried = self._try_random_move(rounds, scorer)
+            if tried is not None:
+                move, undo = tried
+                delta = scorer.score_delta(move)
+                temperature = cooling(progress)
+                if delta < 0 or (
+                    temperature > 0 and self.rng.random() < math.exp(-delta / temperature)
+                ):
+                    scorer.apply(move)
+                    if scorer.score < best_score:
+                        best_score = scorer.score
+                        best_schedule = [list(r) for r in self.season.schedule]
+                else:
+                    undo()
+
+            iteration += 1
+            elapsed = time.perf_counter() - start_time
+            if iteration % self.trace_interval == 0:
+                self.trace.append((elapsed, scorer.score, best_score))
+                self.logger.debug(
+                    "Iteration %i - temperature = %.3f - score = %.2f - best score = %.2f",
+                    iteration,
+                    cooling(progress),
+                    scorer.score,
+                    best_score,
+                )
+            progress = self._get_progress(iteration, elapsed)
+
+        self.trace.append((time.perf_counter() - start_time, scorer.score, best_score))
+        self.season.schedule = best_schedule
+        score = self.scorer.get_score(self.season.schedule, self.season.players)
+        self.logger.info("Annealing finished after %i iterations with score %.3f", iteration, score)
+        return score
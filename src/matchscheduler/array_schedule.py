@@ -0,0 +1,71 @@
+"""Array backed representation of a schedule."""
+
+import numpy as np
+
+from .match import Match, create_match
+
+# marks a bye in a match or an unused court of a partial round
+BYE = -1
+
+
+class ArraySchedule:
+    """A schedule stored as int16 array of shape (rounds, courts, 2).
+
+    Players of a match are sorted like in create_match, byes and unused courts are BYE.
+    The incidence matrix counts for every player and round how often the player plays.
+    """
+
+    def __init__(self, matches: np.ndarray, num_players: int):
+        self.matches = matches
+        self.num_players = num_players
+        rounds, players = self.get_player_occurrences()
+        self.incidence = np.zeros((num_players, len(matches)), dtype=np.int16)
+        np.add.at(self.incidence, (players, rounds), 1)
+
+    def __len__(self) -> int:
+        return len(self.matches)
+
+    @classmethod
+    def from_schedule(
+        cls, schedule: list[list[Match]], num_players: int, num_courts: int | None = None
+    ) -> "ArraySchedule":
+        if num_courts is None:
+            num_courts = max((len(r) for r in schedule), default=0)
+        matches = np.full((len(schedule), num_courts, 2), BYE, dtype=np.int16)
+        for round_index, round_ in enumerate(schedule):
+            for match_index, match in enumerate(round_):
+                matches[round_index, match_index] = [BYE if p is None else p for p in match]
+        return cls(matches, num_players)
+
+    def to_schedule(self) -> list[list[Match]]:
+        return [
+            [
+                create_match(int(p), None if q == BYE else int(q))
+                for p, q in round_.tolist()
+                if p != BYE
+            ]
+            for round_ in self.matches
+        ]
+
+    def get_player_occurrences(self) -> tuple[np.ndarray, np.ndarray]:
+        """Get the round index and player index of every player in the schedule."""
+        rounds = np.broadcast_to(
+            np.arange(len(self.matches))[:, None, None], self.matches.shape
+        ).ravel()
+        players = self.matches.ravel()
+        valid = players != BYE
+        return rounds[valid], players[valid].astype(np.intp)
+
+    def get_pair_occurrences(self) -> tuple[np.ndarray, np.ndarray]:
+        """Get the round index and pair index of every match with two players.
+
+        Pair indizes follow the order of itertools.combinations over all players.
+        """
+        rounds = np.broadcast_to(
+            np.arange(len(self.matches))[:, None], self.matches.shape[:2]
+        ).ravel()
+        p = self.matches[..., 0].ravel().astype(np.intp)
+        q = self.matches[..., 1].ravel().astype(np.intp)
+        valid = (p != BYE) & (q != BYE)
+        p, q = p[valid], q[valid]
+        return rounds[valid], p * (2 * self.num_players - p - 1) // 2 + q - p - 1
@@ -0,0 +1,54 @@
+"""Atomic file writes and checkpoints of long optimization runs."""
+
+import json
+import os
+import random
+import tempfile
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Iterator
+
+
+@contextmanager
+def atomic_path(path: Path) -> Iterator[Path]:
+    """Yield a temporary path next to path, which replaces path when the block succeeds.
+
+    Writers which stream to a file, like openpyxl, don't need the whole content in memory.
+    """
+    path = Path(path)
+    fd, name = tempfile.mkstemp(dir=path.parent, prefix=f".{path.name}.")
+    os.close(fd)
+    try:
+        yield Path(name)
+        with open(name, "rb+") as f:
+            os.fsync(f.fileno())
+        os.replace(name, path)
+    except BaseException:
+        if os.path.exists(name):
+            os.unlink(name)
+        raise
+
+
+def write_atomic(path: Path, data: bytes) -> None:
+    """Write data to path, which holds either the old or the new content at all times."""
+    with atomic_path(path) as tmp_path:
+        tmp_path.write_bytes(data)
+
+
+def write_checkpoint(path: Path, data: dict) -> None:
+    write_atomic(path, json.dumps(data).encode("utf-8"))
+
+
+def read_checkpoint(path: Path) -> dict:
+    with open(path, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+def get_random_state() -> list:
+    """Get the state of the global random generator in a JSON serializable form."""
+    version, state, gauss = random.getstate()
+    return [version, list(state), gauss]
+
+
+def set_random_state(state: list) -> None:
+    random.setstate((state[0], tuple(state[1]), state[2]))
@@ -0,0 +1,342 @@
+"""Stateful scorer which updates the score of a schedule move by move."""
+
+import bisect
+from itertools import combinations
+
+import numpy as np
+
+from .instrumentation import profile
+from .match import Match
+from .pair_table import PairTable
+from .player import Player
+from .scoring_algorithm import get_std_of_pause_from_squares
+
+# a placement puts a match into the slot (round_index, match_index)
+Placement = tuple[int, int, Match]
+Move = tuple[Placement, ...]
+
+
+def get_pair_index(p: int, q: int, num_players: int) -> int:
+    """Get the index of the pair (p, q) with p < q in itertools.combinations order."""
+    return p * (2 * num_players - p - 1) // 2 + q - p - 1
+
+
+class IncrementalScorer:
+    """Keeps the counters behind ScoringAlgorithm.get_score up to date for single moves.
+
+    The scorer holds its own copy of the schedule together with play counts per player,
+    meeting counts per pair and the sorted list of rounds every player and pair occurs in.
+    A move only updates the pauses of the players and pairs it touches from their sums of
+    squared pauses, the remaining terms are reduced with the same numpy calls as
+    ScoringAlgorithm, so the score is equal to ScoringAlgorithm.get_score for the same
+    schedule.
+    """
+
+    def __init__(self, schedule: list[list[Match]], players: list[Player]):
+        self.players = players
+        self.schedule = [list(r) for r in schedule]
+        self.num_rounds = len(schedule)
+        num_players = len(players)
+        pairs = list(combinations(range(num_players), 2))
+        self.pair_table = PairTable(num_players)
+
+        self.player_weights = np.array([p.weight for p in players], dtype=float)
+        self.pair_weights = np.array(
+            [players[p].weight * players[q].weight for p, q in pairs], dtype=float
+        )
+        self.player_counts = np.zeros(num_players, dtype=int)
+        self.pair_counts = np.zeros(len(pairs), dtype=int)
+        self.player_rounds: list[list[int]] = [[] for _ in range(num_players)]
+        self.pair_rounds: list[list[int]] = [[] for _ in pairs]
+        # incidence of players and pairs per round and the sum of squared pauses
+        # (a pause without any occurrence spans the whole season)
+        self.player_incidence = np.zeros((num_players, self.num_rounds), dtype=int)
+        self.pair_incidence = np.zeros((len(pairs), self.num_rounds), dtype=int)
+        self.player_squares = np.full(num_players, self.num_rounds**2, dtype=int)
+        self.pair_squares = np.full(len(pairs), self.num_rounds**2, dtype=int)
+        for round_index, round_ in enumerate(self.schedule):
+            for match in round_:
+                self._add(round_index, match)
+
+        self.player_pauses = self._get_std_of_pauses(self.player_counts, self.player_squares)
+        self.pair_pauses = self._get_std_of_pauses(self.pair_counts, self.pair_squares)
+        self.score = self._compute_score()
+
+    def _get_pair_index(self, match: Match) -> int | None:
+        # the ids of pairs are their indizes, byes come after them
+        match_id = self.pair_table.get_id(match)
+        return match_id if match_id < self.pair_table.num_pairs else None
+
+    def _insert_round(self, rounds: list[int], round_index: int) -> int:
+        """Insert the round and return the change of the sum of squared pauses."""
+        pos = bisect.bisect(rounds, round_index)
+        previous = rounds[pos - 1] if pos > 0 else 0
+        following = rounds[pos] if pos < len(rounds) else self.num_rounds
+        rounds.insert(pos, round_index)
+        return (
+            (round_index - previous) ** 2
+            + (following - round_index) ** 2
+            - (following - previous) ** 2
+        )
+
+    def _delete_round(self, rounds: list[int], round_index: int) -> int:
+        """Delete the round and return the change of the sum of squared pauses."""
+        pos = bisect.bisect_left(rounds, round_index)
+        rounds.pop(pos)
+        previous = rounds[pos - 1] if pos > 0 else 0
+        following = rounds[pos] if pos < len(rounds) else self.num_rounds
+        return (
+            (following - previous) ** 2
+            - (round_index - previous) ** 2
+            - (following - round_index) ** 2
+        )
+
+    def _add(self, round_index: int, match: Match) -> None:
+        for p in self.pair_table.players[self.pair_table.get_id(match)]:
+            self.player_counts[p] += 1
+            self.player_incidence[p, round_index] += 1
+            self.player_squares[p] += self._insert_round(self.player_rounds[p], round_index)
+        pair_index = self._get_pair_index(match)
+        if pair_index is not None:
+            self.pair_counts[pair_index] += 1
+            self.pair_incidence[pair_index, round_index] += 1
+            self.pair_squares[pair_index] += self._insert_round(
+                self.pair_rounds[pair_index], round_index
+            )
+
+    def _remove(self, round_index: int, match: Match) -> None:
+        for p in self.pair_table.players[self.pair_table.get_id(match)]:
+            self.player_counts[p] -= 1
+            self.player_incidence[p, round_index] -= 1
+            self.player_squares[p] += self._delete_round(self.player_rounds[p], round_index)
+        pair_index = self._get_pair_index(match)
+        if pair_index is not None:
+            self.pair_counts[pair_index] -= 1
+            self.pair_incidence[pair_index, round_index] -= 1
+            self.pair_squares[pair_index] += self._delete_round(
+                self.pair_rounds[pair_index], round_index
+            )
+
+    def _get_std_of_pause(self, count: int, squares: int) -> float:
+        if count > 1:
+            return get_std_of_pause_from_squares(count + 1, squares, self.num_rounds)
+        return self.num_rounds
+
+    def _compute_score(self) -> float:
+        # same order of operations as ScoringAlgorithm.get_score
+        return (
+            self.num_rounds * np.std(self.pair_counts / self.pair_weights)
+            + self.num_rounds * float(np.std(self.player_counts / self.player_weights))
+            + np.sum(self.pair_pauses)
+            + np.sum(self.player_pauses)
+        )
+
+    def _place(self, move: Move) -> tuple[Move, set[int], set[int]]:
+        """Put the matches of the move into the schedule.
+
+        Returns the inverse move and the indizes of all touched players and pairs.
+        """
+        inverse = []
+        touched_players: set[int] = set()
+        touched_pairs: set[int] = set()
+        for round_index, match_index, match in move:
+            old_match = self.schedule[round_index][match_index]
+            inverse.append((round_index, match_index, old_match))
+            self._remove(round_index, old_match)
+            self._add(round_index, match)
+            self.schedule[round_index][match_index] = match
+            for m in (old_match, match):
+                touched_players.update(self.pair_table.players[self.pair_table.get_id(m)])
+                pair_index = self._get_pair_index(m)
+                if pair_index is not None:
+                    touched_pairs.add(pair_index)
+        return tuple(reversed(inverse)), touched_players, touched_pairs
+
+    def _update_pauses(self, players: set[int], pairs: set[int]) -> None:
+        for p in players:
+            self.player_pauses[p] = self._get_std_of_pause(
+                int(self.player_counts[p]), int(self.player_squares[p])
+            )
+        for i in pairs:
+            self.pair_pauses[i] = self._get_std_of_pause(
+                int(self.pair_counts[i]), int(self.pair_squares[i])
+            )
+
+    @profile
+    def score_delta(self, move: Move) -> float:
+        """Get the change of the score if the move would be applied, without applying it."""
+        inverse, players, pairs = self._place(move)
+        old_player_pauses = {p: self.player_pauses[p] for p in players}
+        old_pair_pauses = {i: self.pair_pauses[i] for i in pairs}
+        self._update_pauses(players, pairs)
+        new_score = self._compute_score()
+
+        self._place(inverse)
+        for p, value in old_player_pauses.items():
+            self.player_pauses[p] = value
+        for i, value in old_pair_pauses.items():
+            self.pair_pauses[i] = value
+        return new_score - self.score
+
+    @profile
+    def apply(self, move: Move) -> float:
+        """Apply the move and return the new score."""
+        _, players, pairs = self._place(move)
+        self._update_pauses(players, pairs)
+        self.score = self._compute_score()
+        return self.score
+
+    def get_move_to(self, schedule: list[list[Match]], round_indizes: list[int]) -> Move:
+        """Get the move which turns the given rounds into the rounds of the schedule."""
+        return tuple(
+            (round_index, match_index, match)
+            for round_index in round_indizes
+            for match_index, match in enumerate(schedule[round_index])
+            if self.schedule[round_index][match_index] != match
+        )
+
+    def _get_std_of_pauses(self, counts: np.ndarray, squares: np.ndarray) -> np.ndarray:
+        """Get the standard deviations of pauses from occurrence counts and squared pauses."""
+        num_gaps = counts + 1
+        return np.where(
+            counts > 1,
+            np.sqrt(np.maximum(num_gaps * squares - self.num_rounds**2, 0)) / num_gaps,
+            float(self.num_rounds),
+        )
+
+    def _get_neighbours(
+        self, incidence: np.ndarray, round_index: int
+    ) -> tuple[np.ndarray, np.ndarray]:
+        """Get the previous and following occurrence of every row around the round.
+
+        The start of the season counts as round 0 and the end as num_rounds.
+        """
+        previous = np.max(
+            np.where(incidence[:, :round_index] > 0, np.arange(round_index), 0),
+            axis=1,
+            initial=0,
+        )
+        following = np.min(
+            np.where(
+                incidence[:, round_index + 1 :] > 0,
+                np.arange(round_index + 1, self.num_rounds),
+                self.num_rounds,
+            ),
+            axis=1,
+            initial=self.num_rounds,
+        )
+        return previous, following
+
+    def _get_std_if_inserted(
+        self, incidence: np.ndarray, counts: np.ndarray, squares: np.ndarray, round_index: int
+    ) -> np.ndarray:
+        previous, following = self._get_neighbours(incidence, round_index)
+        squares = (
+            squares
+            - (following - previous) ** 2
+            + (round_index - previous) ** 2
+            + (following - round_index) ** 2
+        )
+        return self._get_std_of_pauses(counts + 1, squares)
+
+    def _get_std_if_deleted(
+        self, incidence: np.ndarray, counts: np.ndarray, squares: np.ndarray, round_index: int
+    ) -> np.ndarray:
+        previous, following = self._get_neighbours(incidence, round_index)
+        squares = (
+            squares
+            + (following - previous) ** 2
+            - (round_index - previous) ** 2
+            - (following - round_index) ** 2
+        )
+        return self._get_std_of_pauses(counts - 1, squares)
+
+    @profile
+    def get_slot_deltas(
+        self, round_index: int, match_index: int, candidates: list[Match]
+    ) -> np.ndarray:
+        """Get the change of the score for every candidate match replacing the slot.
+
+        All candidates are evaluated at once without changing the state. Candidates must
+        consist of two players which don't play in the other matches of the round and must
+        differ from the current match. The deltas are calculated with closed formulas and
+        can therefore differ from score_delta by rounding errors.
+        """
+        num_players = len(self.players)
+        num_rounds = self.num_rounds
+        if not candidates:
+            return np.zeros(0)
+        cp = np.array([m[0] for m in candidates], dtype=np.intp)
+        cq = np.array([m[1] for m in candidates], dtype=np.intp)
+        candidate_pairs = cp * (2 * num_players - cp - 1) // 2 + cq - cp - 1
+        removed_id = self.pair_table.get_id(self.schedule[round_index][match_index])
+        removed_players = np.array(self.pair_table.players[removed_id], dtype=np.intp)
+        removed_pair = removed_id if removed_id < self.pair_table.num_pairs else None
+
+        # standard deviation of weighted times playing
+        x = self.player_counts / self.player_weights
+        x[removed_players] -= 1 / self.player_weights[removed_players]
+        dp, dq = 1 / self.player_weights[cp], 1 / self.player_weights[cq]
+        s1 = np.sum(x) + dp + dq
+        s2 = np.sum(x**2) + (x[cp] + dp) ** 2 - x[cp] ** 2 + (x[cq] + dq) ** 2 - x[cq] ** 2
+        delta = num_rounds * (
+            np.sqrt(np.maximum(s2 / num_players - (s1 / num_players) ** 2, 0))
+            - np.std(self.player_counts / self.player_weights)
+        )
+
+        # standard deviation of weighted meetings of all pairs
+        num_pairs = len(self.pair_counts)
+        y = self.pair_counts / self.pair_weights
+        if removed_pair is not None:
+            y[removed_pair] -= 1 / self.pair_weights[removed_pair]
+        dy = 1 / self.pair_weights[candidate_pairs]
+        s1 = np.sum(y) + dy
+        s2 = np.sum(y**2) + (y[candidate_pairs] + dy) ** 2 - y[candidate_pairs] ** 2
+        delta += num_rounds * (
+            np.sqrt(np.maximum(s2 / num_pairs - (s1 / num_pairs) ** 2, 0))
+            - np.std(self.pair_counts / self.pair_weights)
+        )
+
+        # pauses of pairs
+        if removed_pair is not None:
+            index = [removed_pair]
+            delta += (
+                self._get_std_if_deleted(
+                    self.pair_incidence[index],
+                    self.pair_counts[index],
+                    self.pair_squares[index],
+                    round_index,
+                )[0]
+                - self._get_std_of_pauses(self.pair_counts[index], self.pair_squares[index])[0]
+            )
+        current = self._get_std_of_pauses(
+            self.pair_counts[candidate_pairs], self.pair_squares[candidate_pairs]
+        )
+        delta += (
+            self._get_std_if_inserted(
+                self.pair_incidence[candidate_pairs],
+                self.pair_counts[candidate_pairs],
+                self.pair_squares[candidate_pairs],
+                round_index,
+            )
+            - current
+        )
+
+        # pauses of players, the removed players are first taken out of the round and
+        # gain their current pause back if they are part of the candidate
+        current = self._get_std_of_pauses(self.player_counts, self.player_squares)
+        gain = (
+            self._get_std_if_inserted(
+                self.player_incidence, self.player_counts, self.player_squares, round_index
+            )
+            - current
+        )
+        removed = self._get_std_if_deleted(
+            self.player_incidence[removed_players],
+            self.player_counts[removed_players],
+            self.player_squares[removed_players],
+            round_index,
+        )
+        gain[removed_players] = current[removed_players] - removed
+        delta += np.sum(removed - current[removed_players]) + gain[cp] + gain[cq]
+        return delta
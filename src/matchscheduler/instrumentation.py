@@ -0,0 +1,88 @@
+"""Optional profiling of hot functions, disabled by default.
+
+The mode is read once at import from the environment variable MATCHSCHEDULER_PROFILE:
+
+- unset or empty: profile returns the function unchanged, there is no overhead
+- "line": line_profiler (optional dependency), results are written on exit
+- "cprofile": cProfile over the whole process, stats are written on exit
+- "timer": count calls and inclusive time per decorated function, see get_timings
+
+Output files start with MATCHSCHEDULER_PROFILE_OUTPUT (default "profile_output").
+"""
+
+import atexit
+import cProfile
+import functools
+import logging
+import os
+import time
+from typing import Callable, TypeVar
+
+F = TypeVar("F", bound=Callable)
+
+MODE = os.environ.get("MATCHSCHEDULER_PROFILE", "").lower()
+OUTPUT_PREFIX = os.environ.get("MATCHSCHEDULER_PROFILE_OUTPUT", "profile_output")
+
+logger = logging.getLogger(__name__)
+
+# calls and seconds per qualified function name in timer mode
+_timings: dict[str, list] = {}
+
+
+def _no_profile(func: F) -> F:
+    return func
+
+
+def _timer_profile(func: F) -> F:
+    entry = _timings.setdefault(f"{func.__module__}.{func.__qualname__}", [0, 0.0])
+
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        start = time.perf_counter()
+        try:
+            return func(*args, **kwargs)
+        finally:
+            entry[0] += 1
+            entry[1] += time.perf_counter() - start
+
+    return wrapper  # type: ignore
+
+
+def _get_profile() -> Callable:
+    if MODE == "line":
+        try:
+            from line_profiler import profile as line_profile  # pylint: disable=C0415
+        except ImportError:
+            logger.warning("line_profiler is not installed, profiling is disabled.")
+            return _no_profile
+        line_profile.enable(output_prefix=OUTPUT_PREFIX)
+        return line_profile
+    if MODE == "cprofile":
+        profiler = cProfile.Profile()
+        profiler.enable()
+        atexit.register(lambda: profiler.dump_stats(f"{OUTPUT_PREFIX}.prof"))
+        return _no_profile
+    if MODE == "timer":
+        return _timer_profile
+    if MODE:
+        logger.warning("Unknown profiling mode %s, profiling is disabled.", MODE)
+    return _no_profile
+
+
+profile = _get_profile()
+
+
+def get_timings() -> dict[str, tuple[int, float]]:
+    """Get calls and seconds of every decorated function which was called in timer mode."""
+    return {name: (calls, seconds) for name, (calls, seconds) in _timings.items() if calls}
+
+
+def reset_timings() -> None:
+    for entry in _timings.values():
+        entry[0], entry[1] = 0, 0.0
+
+
+def log_timings(target: logging.Logger = logger) -> None:
+    """Log the timings sorted by time, does nothing if timer mode is disabled."""
+    for name, (calls, seconds) in sorted(get_timings().items(), key=lambda t: -t[1][1]):
+        target.info("%s: %i calls, %.3f s", name, calls, seconds)
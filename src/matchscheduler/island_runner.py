@@ -0,0 +1,118 @@
+"""Parallel island model search with periodic migration of schedules."""
+
+import logging
+import multiprocessing
+import random
+from concurrent.futures import ProcessPoolExecutor
+
+from .annealing_optimizer import AnnealingOptimizer, geometric_cooling
+from .match import Match, create_match
+from .season import Season
+
+# schedules are exchanged in the form of Season.to_dict()["schedule"]
+SerializedSchedule = list[list[Match]]
+
+
+def _create_season(settings: dict, seed: int, schedule: SerializedSchedule | None) -> Season:
+    # the season is generated from the seed, only the schedule changes between epochs
+    random.seed(seed)
+    season = Season.create_from_settings(settings)
+    if schedule is not None:
+        season.schedule = [[create_match(m[0], m[1]) for m in r] for r in schedule]
+    return season
+
+
+def _run_island_epoch(
+    settings: dict,
+    seed: int,
+    schedule: SerializedSchedule | None,
+    epoch: int,
+    epochs: int,
+    iterations: int,
+    start_temperature: float | None,
+) -> tuple[float, SerializedSchedule, float]:
+    """Anneal one island for one epoch.
+
+    The temperature falls geometrically over all epochs to a thousandth of the start
+    temperature, which is calibrated in the first epoch. Returns the best score and
+    schedule of the epoch and the start temperature.
+    """
+    season = _create_season(settings, seed, schedule)
+    optimizer = AnnealingOptimizer(
+        season, max_iterations=iterations, rng=random.Random(f"{seed}-{epoch}")
+    )
+    if start_temperature is None:
+        start_temperature = optimizer.calibrate_start_temperature()
+    optimizer.cooling = geometric_cooling(
+        start_temperature * 0.001 ** (epoch / epochs),
+        start_temperature * 0.001 ** ((epoch + 1) / epochs),
+    )
+    score = optimizer.optimize_schedule()
+    return score, season.to_dict()["schedule"], start_temperature
+
+
+class IslandRunner:
+    """Optimize a season on several islands which exchange their best schedules.
+
+    Every island anneals its own season for migration_interval iterations per epoch, all
+    islands of an epoch run in parallel. The temperature falls over all epochs. After
+    every epoch each island takes over the schedule of its left neighbour in a ring if that
+    is better. Runs are reproducible for the same seeds, one island per seed, independent of
+    max_workers. history holds the scores of all islands after every epoch.
+    """
+
+    def __init__(
+        self,
+        settings: dict,
+        seeds: list[int],
+        epochs: int = 10,
+        migration_interval: int = 5000,
+        max_workers: int | None = None,
+    ):
+        self.settings = settings
+        self.seeds = seeds
+        self.epochs = epochs
+        self.migration_interval = migration_interval
+        self.max_workers = max_workers
+        self.history: list[list[float]] = []
+        self.logger = logging.getLogger(__name__)
+
+    def run(self) -> tuple[float, Season]:
+        """Run all epochs and return the best score and season."""
+        num_islands = len(self.seeds)
+        schedules: list[SerializedSchedule | None] = [None] * num_islands
+        scores = [float("inf")] * num_islands
+        start_temperatures: list[float | None] = [None] * num_islands
+        with ProcessPoolExecutor(
+            max_workers=self.max_workers, mp_context=multiprocessing.get_context("spawn")
+        ) as executor:
+            for epoch in range(self.epochs):
+                results = list(
+                    executor.map(
+                        _run_island_epoch,
+                        [self.settings] * num_islands,
+                        self.seeds,
+                        schedules,
+                        [epoch] * num_islands,
+                        [self.epochs] * num_islands,
+                        [self.migration_interval] * num_islands,
+                        start_temperatures,
+                    )
+                )
+                for i, (score, schedule, start_temperature) in enumerate(results):
+                    scores[i], schedules[i], start_temperatures[i] = (
+                        score,
+                        schedule,
+                        start_temperature,
+                    )
+                self.history.append(list(scores))
+                self.logger.info("Epoch %i finished with best score %.3f", epoch, min(scores))
+
+                # migrate the best schedules along the ring
+                migrated = [(scores[i - 1], schedules[i - 1]) for i in range(num_islands)]
+                for i, (score, schedule) in enumerate(migrated):
+                    if score < scores[i]:
+                        scores[i], schedules[i] = score, schedule
+
+        best = min(range(num_islands), key=lambda i: scores[i])
+        return scores[best], _create_season(self.settings, self.seeds[best], schedules[best])
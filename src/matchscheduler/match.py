@@ -2,8 +2,7 @@
 
 from typing import Tuple
 
-from line_profiler import profile
-
+from .instrumentation import profile
 from .player import Player
 
 Match = Tuple[int, int | None]
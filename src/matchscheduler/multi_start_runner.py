@@ -0,0 +1,150 @@
+"""Run the optimizer from several seeds in parallel and keep the best season."""
+
+import logging
+import math
+import multiprocessing
+import random
+import time
+from concurrent.futures import FIRST_COMPLETED, Future, ProcessPoolExecutor, wait
+from multiprocessing.sharedctypes import Synchronized
+from multiprocessing.synchronize import Event
+
+from .optimizer import Optimizer
+from .schedule_archive import ScheduleArchive
+from .season import Season
+
+# shared state of a worker process, set by _init_worker
+_WORKER_STATE: dict = {}
+
+
+def _init_worker(incumbent: Synchronized, cancelled: Event, give_up_ratio: float) -> None:
+    _WORKER_STATE.update(incumbent=incumbent, cancelled=cancelled, give_up_ratio=give_up_ratio)
+
+
+def _is_cancelled() -> bool:
+    return _WORKER_STATE["cancelled"].is_set()
+
+
+def _publish_and_check(iteration: int, score: float) -> bool:
+    """Publish the score and return True if the run should stop."""
+    shared_incumbent = _WORKER_STATE["incumbent"]
+    with shared_incumbent.get_lock():
+        shared_incumbent.value = min(shared_incumbent.value, score)
+        incumbent = shared_incumbent.value
+    if _is_cancelled():
+        return True
+    # the first iteration is always far off, so give up at the earliest after the second
+    return iteration >= 2 and score > incumbent * (1 + _WORKER_STATE["give_up_ratio"])
+
+
+def _optimize_seed(
+    settings: dict, seed: int, deadline: float | None, target_score: float | None
+) -> tuple[int, float, dict]:
+    """Optimize the season of a seed until the deadline, a time.time() timestamp."""
+    random.seed(seed)
+    season = Season.create_from_settings(settings)
+    max_seconds = None if deadline is None else max(deadline - time.time(), 0)
+    score = Optimizer(season).optimize_schedule(
+        _publish_and_check,
+        max_seconds=max_seconds,
+        target_score=target_score,
+        should_stop=_is_cancelled,
+    )
+    _publish_and_check(0, score)
+    return seed, score, season.to_dict()
+
+
+class MultiStartRunner:
+    """Optimize a season from several seeds on a process pool.
+
+    Every worker publishes its current score to a shared incumbent. Runs which are more
+    than give_up_ratio worse than the incumbent stop early. All runs are cancelled as soon
+    as max_seconds have passed or a run reached target_score. results holds
+    (seed, score) of every finished run and archive the archive_size best distinct
+    schedules of all runs.
+    """
+
+    def __init__(
+        self,
+        settings: dict,
+        seeds: list[int],
+        max_workers: int | None = None,
+        max_seconds: float | None = None,
+        target_score: float | None = None,
+        give_up_ratio: float = 0.2,
+        archive_size: int = 10,
+    ):
+        self.settings = settings
+        self.seeds = seeds
+        self.max_workers = max_workers
+        self.max_seconds = max_seconds
+        self.target_score = target_score
+        self.give_up_ratio = give_up_ratio
+        self.results: list[tuple[int, float]] = []
+        self.archive_size = archive_size
+        self.archive: ScheduleArchive | None = None
+        self.logger = logging.getLogger(__name__)
+
+    def _is_done(self, best_score: float, start_time: float) -> bool:
+        if self.target_score is not None and best_score <= self.target_score:
+            self.logger.info("Target score reached.")
+            return True
+        if self.max_seconds is not None and time.monotonic() - start_time >= self.max_seconds:
+            self.logger.info("Time budget used up.")
+            return True
+        return False
+
+    def _add_result(self, seed: int, score: float, data: dict) -> Season:
+        self.results.append((seed, score))
+        season = Season.from_dict(data)
+        if self.archive is None:
+            self.archive = ScheduleArchive(season, self.archive_size)
+        self.archive.add(season.schedule, score)
+        return season
+
+    def run(self) -> tuple[float, Season]:
+        """Run all seeds and return the best score and season."""
+        context = multiprocessing.get_context("spawn")
+        incumbent = context.Value("d", math.inf)
+        cancelled = context.Event()
+        executor = ProcessPoolExecutor(
+            max_workers=self.max_workers,
+            mp_context=context,
+            initializer=_init_worker,
+            initargs=(incumbent, cancelled, self.give_up_ratio),
+        )
+        start_time = time.monotonic()
+        # workers stop on their own before the next move once the deadline has passed
+        deadline = None if self.max_seconds is None else time.time() + self.max_seconds
+        pending: set[Future] = {
+            executor.submit(_optimize_seed, self.settings, seed, deadline, self.target_score)
+            for seed in self.seeds
+        }
+        best_score, best_season = math.inf, None
+        try:
+            while pending and not self._is_done(best_score, start_time):
+                timeout = None
+                if self.max_seconds is not None:
+                    timeout = max(self.max_seconds - (time.monotonic() - start_time), 0)
+                done, pending = wait(pending, timeout=timeout, return_when=FIRST_COMPLETED)
+                for future in done:
+                    seed, score, data = future.result()
+                    season = self._add_result(seed, score, data)
+                    self.logger.info("Seed %i finished with score %.3f", seed, score)
+                    if score < best_score:
+                        best_score, best_season = score, season
+        finally:
+            # running workers stop before their next move and return their season
+            cancelled.set()
+            executor.shutdown(wait=True, cancel_futures=True)
+        for future in pending:
+            if future.cancelled():
+                continue
+            seed, score, data = future.result()
+            season = self._add_result(seed, score, data)
+            if score < best_score:
+                best_score, best_season = score, season
+
+        if best_season is None:
+            raise RuntimeError("No optimization run finished.")
+        return best_score, best_season
@@ -1,62 +1,263 @@
 import logging
 import random
+import sys
+import time
 from itertools import combinations
+from pathlib import Path
+from typing import Callable, Collection, Protocol
 
-from line_profiler import profile
+import numpy as np
 
 from matchscheduler.season import Season
 
-from .match import create_match, get_players_of_match
-from .scoring_algorithm import ScoringAlgorithm
+from .checkpoint import get_random_state, read_checkpoint, set_random_state, write_checkpoint
+from .incremental_scorer import IncrementalScorer, Move
+from .instrumentation import log_timings, profile
+from .match import Match, get_players_of_match
+from .optimizer_stats import INTRA_ROUND_SWAP, MATCH_SWAP, PLAYERS_SWAP, OptimizerStats
+from .schedule_diff import DeviationPenalty
+from .score_cache import ScoreCache
+from .scoring_algorithm import BoundScoringAlgorithm
+
+# reasons why optimize_schedule stopped
+CONVERGED = "converged"
+MAX_SECONDS = "max_seconds"
+MAX_ITERATIONS = "max_iterations"
+TARGET_SCORE = "target_score"
+STALL_LIMIT = "stall_limit"
+CALLBACK = "callback"
+CANCELLED = "cancelled"
+
+PASS_ORDER = (PLAYERS_SWAP, INTRA_ROUND_SWAP, MATCH_SWAP)
+
+
+class ScheduleOptimizer(Protocol):
+    """Interface shared by all optimizers, they change the schedule of the season in place."""
+
+    season: Season
+
+    def optimize_schedule(self) -> float: ...
 
 
 class Optimizer:
+    """Greedy optimizer which applies every improving move until none is left.
 
-    def __init__(self, season: Season):
+    Only improving moves are applied, so the schedule of the season is always the best one
+    seen, also if a run is stopped early. stop_reason tells why the last run stopped.
+    stats holds the metrics of every pass and outer iteration, they are appended as JSON
+    lines to stats_path if given.
+
+    With checkpoint_path the season, the position in the passes and the state of the random
+    generator are written to disk every checkpoint_interval seconds and at the end of a
+    run. from_checkpoint continues such a run.
+
+    With a reference schedule every move also pays deviation_weight for each match it
+    takes out of or puts back into the rounds of the reference, so a reoptimization only
+    moves away from a published schedule for a worthwhile improvement. The returned score
+    does not include this penalty.
+
+    With a score_cache the moves are looked up by the hash of the schedule they lead to
+    before they are scored, schedules seen before then cost a dict lookup.
+    """
+
+    def __init__(
+        self,
+        season: Season,
+        stats_path: Path | None = None,
+        checkpoint_path: Path | None = None,
+        checkpoint_interval: float = 60,
+        reference: list[list[Match]] | None = None,
+        deviation_weight: float = 1.0,
+        score_cache: ScoreCache | None = None,
+    ):
         self.season = season
         self.logger = logging.getLogger(__name__)
-        self.scorer = ScoringAlgorithm()
+        self.scorer = BoundScoringAlgorithm(season.players)
+        self.stats = OptimizerStats(stats_path)
+        self.stop_reason: str | None = None
+        self.checkpoint_path = checkpoint_path
+        self.checkpoint_interval = checkpoint_interval
+        self._deadline: float | None = None
+        self._target_score: float | None = None
+        self._should_stop: Callable[[], bool] | None = None
+        self._stall_limit: int | None = None
+        self._stalled = 0
+        self._iteration = 0
+        # (pass, index of the next step, swaps) of the last step and of the checkpoint to resume
+        self._position: tuple[str, int, int] = (PLAYERS_SWAP, 0, 0)
+        self._resume_position: tuple[str, int, int] | None = None
+        self._pass_random_state: list | None = None
+        self._next_checkpoint = 0.0
+        self.penalty = None if reference is None else DeviationPenalty(reference, deviation_weight)
+        self.score_cache = score_cache
+        # hash of the schedule of the current scorer, only used with score_cache
+        self._hash = 0
+
+    @classmethod
+    def from_checkpoint(
+        cls,
+        checkpoint_path: Path,
+        stats_path: Path | None = None,
+        checkpoint_interval: float = 60,
+    ) -> "Optimizer":
+        """Create an optimizer whose optimize_schedule continues the run of the checkpoint."""
+        data = read_checkpoint(checkpoint_path)
+        optimizer = cls(
+            Season.from_dict(data["season"]), stats_path, checkpoint_path, checkpoint_interval
+        )
+        position = data["position"]
+        optimizer._resume_position = (position["pass"], position["index"], position["swaps"])
+        optimizer._iteration = data["iteration"]
+        set_random_state(data["random_state"])
+        return optimizer
+
+    def _start_pass(self, name: str) -> int:
+        """Get the index of the first step of a pass, which is only > 0 when resuming."""
+        if self.checkpoint_path is not None:
+            self._pass_random_state = get_random_state()
+        if self._resume_position is None:
+            return 0
+        resume_pass, index, _ = self._resume_position
+        if PASS_ORDER.index(resume_pass) > PASS_ORDER.index(name):
+            # the pass was finished before the checkpoint
+            return sys.maxsize
+        self._resume_position = None
+        return index
+
+    def _step(self, name: str, index: int, swaps: int) -> None:
+        self._position = (name, index, swaps)
+        if self.checkpoint_path is not None and time.perf_counter() >= self._next_checkpoint:
+            self._write_checkpoint()
+
+    def _write_checkpoint(self) -> None:
+        name, index, swaps = self._position
+        write_checkpoint(
+            self.checkpoint_path,  # type: ignore
+            {
+                "season": self.season.to_dict(),
+                "iteration": self._iteration,
+                "position": {"pass": name, "index": index, "swaps": swaps},
+                "random_state": self._pass_random_state or get_random_state(),
+                "stop_reason": self.stop_reason,
+            },
+        )
+        self._next_checkpoint = time.perf_counter() + self.checkpoint_interval
+
+    def _check_bounds(self, score: float) -> bool:
+        """Check the bounds of the run inside the passes and set stop_reason if one is hit."""
+        if self.stop_reason is not None:
+            return True
+        if self._deadline is not None and time.perf_counter() >= self._deadline:
+            self.stop_reason = MAX_SECONDS
+        elif self._target_score is not None and score <= self._target_score:
+            self.stop_reason = TARGET_SCORE
+        elif self._stall_limit is not None and self._stalled >= self._stall_limit:
+            self.stop_reason = STALL_LIMIT
+        elif self._should_stop is not None and self._should_stop():
+            self.stop_reason = CANCELLED
+        return self.stop_reason is not None
+
+    def _count_move(self, accepted: bool) -> None:
+        self._stalled = 0 if accepted else self._stalled + 1
+
+    def _create_scorer(self) -> IncrementalScorer:
+        if self.score_cache is not None:
+            self._hash = self.score_cache.get_hash(self.season.schedule)
+        return IncrementalScorer(self.season.schedule, self.season.players)
+
+    def _apply(self, scorer: IncrementalScorer, move: Move) -> float:
+        if self.score_cache is not None:
+            self._hash = self.score_cache.get_move_hash(self._hash, scorer.schedule, move)
+        return scorer.apply(move)
+
+    def _get_score_delta(self, scorer: IncrementalScorer, move: Move) -> float:
+        if self.score_cache is None:
+            return scorer.score_delta(move)
+        value = self.score_cache.get_move_hash(self._hash, scorer.schedule, move)
+        score = self.score_cache.get(value)
+        if score is None:
+            delta = scorer.score_delta(move)
+            self.score_cache.put(value, scorer.score + delta)
+            return delta
+        return score - scorer.score
+
+    def _get_delta(self, scorer: IncrementalScorer, move: Move) -> float:
+        delta = self._get_score_delta(scorer, move)
+        if self.penalty is not None:
+            delta += self.penalty.get_move_delta(scorer.schedule, move)
+        return delta
+
+    def _skip_round(self, round_index: int, first: int, rounds: Collection[int] | None) -> bool:
+        return (
+            round_index < first
+            or round_index in self.season.fixed_rounds
+            or (rounds is not None and round_index not in rounds)
+        )
 
     @profile
-    def optimize_schedule_by_swapping_players(self, swaps: int) -> int:
-        """Optimize the schedule by swapping players."""
+    def optimize_schedule_by_swapping_players(
+        self, swaps: int, rounds: Collection[int] | None = None
+    ) -> int:
+        """Optimize the schedule by swapping players, only in rounds if given."""
 
-        current_score = self.scorer.get_score(self.season.schedule, self.season.players)
+        scorer = self._create_scorer()
+        stats = self.stats.get_pass(PLAYERS_SWAP)
+        first = self._start_pass(PLAYERS_SWAP)
         # switch with all possible players
         for round_index, round in enumerate(self.season.schedule):
-            if round_index in self.season.fixed_rounds:
+            if self._skip_round(round_index, first, rounds):
                 continue
+            self._step(PLAYERS_SWAP, round_index, swaps)
             self.logger.debug(
                 "Switching all players: Starting new round %s", self.season.dates[round_index]
             )
 
-            for match_index, current_match in enumerate(round):
-                for p, q in combinations(range(len(self.season.players)), 2):
-                    possible_match = create_match(p, q)
-                    if possible_match == current_match:
-                        continue
-                    changed = self.season.change_match(round_index, match_index, possible_match)
-                    if not changed:
-                        continue
-                    new_score = self.scorer.get_score(self.season.schedule, self.season.players)
-                    if new_score < current_score:
-                        swaps += 1
-                        self.logger.debug(
-                            "Switched players - old score = %.2f - new score = %.2f",
-                            current_score,
-                            new_score,
-                        )
-                        current_score = new_score
-                        current_match = possible_match
-                    else:
-                        # swap back to original match
-                        self.season.change_match(round_index, match_index, current_match)
+            for match_index, _ in enumerate(round):
+                if self._check_bounds(scorer.score):
+                    return swaps
+                # evaluate all possible matches for this slot at once and take the best
+                start = time.perf_counter()
+                candidates = self.season.get_candidate_matches(round_index, match_index)
+                stats.mutation_seconds += time.perf_counter() - start
+                if not candidates:
+                    continue
+                stats.tried += len(candidates)
+                stats.evaluated += len(candidates)
+                start = time.perf_counter()
+                deltas = scorer.get_slot_deltas(round_index, match_index, candidates)
+                if self.penalty is not None:
+                    deltas = deltas + self.penalty.get_slot_deltas(
+                        round_index, round[match_index], candidates
+                    )
+                best_candidate = candidates[int(np.argmin(deltas))]
+                move = ((round_index, match_index, best_candidate),)
+                # confirm the improvement with the exact score
+                improves = self._get_delta(scorer, move) < 0
+                stats.scoring_seconds += time.perf_counter() - start
+                self._count_move(improves)
+                if improves:
+                    start = time.perf_counter()
+                    self.season.change_match(round_index, match_index, best_candidate)
+                    stats.mutation_seconds += time.perf_counter() - start
+                    swaps += 1
+                    stats.accepted += 1
+                    current_score = scorer.score
+                    start = time.perf_counter()
+                    new_score = self._apply(scorer, move)
+                    stats.scoring_seconds += time.perf_counter() - start
+                    self.logger.debug(
+                        "Switched players - old score = %.2f - new score = %.2f",
+                        current_score,
+                        new_score,
+                    )
 
-        current_score = self.scorer.get_score(self.season.schedule, self.season.players)
         # switch players between matches of a round
+        stats = self.stats.get_pass(INTRA_ROUND_SWAP)
+        first = self._start_pass(INTRA_ROUND_SWAP)
         for round_index, round in enumerate(self.season.schedule):
-            if round_index in self.season.fixed_rounds:
+            if self._skip_round(round_index, first, rounds):
                 continue
+            self._step(INTRA_ROUND_SWAP, round_index, swaps)
             self.logger.debug(
                 "Switching players inside round:" + "Starting new round %s",
                 self.season.dates[round_index],
@@ -68,48 +269,77 @@ class Optimizer:
                     for p1 in get_players_of_match(round[match1])
                     for p2 in get_players_of_match(round[match2])
                 ]:
+                    if self._check_bounds(scorer.score):
+                        return swaps
+                    stats.tried += 1
+                    start = time.perf_counter()
                     swapped = self.season.swap_players_of_existing_matches(
                         round_index, player1, player2
                     )
+                    stats.mutation_seconds += time.perf_counter() - start
                     if not swapped:
+                        stats.invalid += 1
                         continue
-                    new_score = self.scorer.get_score(self.season.schedule, self.season.players)
-                    if new_score < current_score:
+                    stats.evaluated += 1
+                    start = time.perf_counter()
+                    move = scorer.get_move_to(self.season.schedule, [round_index])
+                    improves = self._get_delta(scorer, move) < 0
+                    stats.scoring_seconds += time.perf_counter() - start
+                    self._count_move(improves)
+                    if improves:
                         swaps += 1
+                        stats.accepted += 1
+                        current_score = scorer.score
+                        start = time.perf_counter()
+                        new_score = self._apply(scorer, move)
+                        stats.scoring_seconds += time.perf_counter() - start
                         self.logger.debug(
                             "Switched players insied existing round "
                             + "- old score = %.2f - new score = %.2f",
                             current_score,
                             new_score,
                         )
-                        current_score = new_score
                         break
                     # swap back to original matches
+                    start = time.perf_counter()
                     self.season.swap_players_of_existing_matches(round_index, player1, player2)
+                    stats.mutation_seconds += time.perf_counter() - start
 
         return swaps
 
     @profile
-    def optimize_schedule_by_swapping_matches(self, swaps: int) -> int:
-        """Optimize the schedule by swapping matches."""
+    def optimize_schedule_by_swapping_matches(
+        self, swaps: int, rounds: Collection[int] | None = None
+    ) -> int:
+        """Optimize the schedule by swapping matches, only between rounds if given."""
         # cant be removed even if we swap players between existing matches
         # it gives an additional random factor to the algorithmus
 
+        if rounds is None:
+            rounds = range(len(self.season.schedule))
+        # fixed rounds don't change and a partial one may have less matches than courts
         indizes = [
-            (i, j) for i in range(len(self.season.schedule)) for j in range(self.season.num_courts)
+            (i, j)
+            for i in sorted(rounds)
+            if i not in self.season.fixed_rounds
+            for j in range(len(self.season.schedule[i]))
         ]
 
         # shuffle index to have a random factor
         # (thus start if schedule is not to optimized)
+        first = self._start_pass(MATCH_SWAP)
         index_combination = list(combinations(indizes, 2))
         random.shuffle(index_combination)
 
-        current_score = self.scorer.get_score(self.season.schedule, self.season.players)
+        scorer = self._create_scorer()
+        stats = self.stats.get_pass(MATCH_SWAP)
 
-        for (round_index1, match_index1), (
-            round_index2,
-            match_index2,
-        ) in index_combination:
+        for index, ((round_index1, match_index1), (round_index2, match_index2)) in enumerate(
+            index_combination
+        ):
+            if index < first:
+                continue
+            self._step(MATCH_SWAP, index, swaps)
             self.logger.debug(
                 "try swapping Round %i Match %i with Round %i Match %i",
                 round_index1,
@@ -120,51 +350,181 @@ class Optimizer:
             if (
                 self.season.schedule[round_index1][match_index1]
                 == self.season.schedule[round_index2][match_index2]
-                or round_index1 in self.season.fixed_rounds
-                or round_index2 in self.season.fixed_rounds
             ):
                 continue
+            if self._check_bounds(scorer.score):
+                return swaps
+            stats.tried += 1
+            start = time.perf_counter()
             switched = self.season.switch_matches(
                 round_index1, match_index1, round_index2, match_index2
             )
+            stats.mutation_seconds += time.perf_counter() - start
             if not switched:
+                stats.invalid += 1
                 continue
-            new_score = self.scorer.get_score(self.season.schedule, self.season.players)
-            if new_score < current_score:
+            move = (
+                (round_index1, match_index1, self.season.schedule[round_index1][match_index1]),
+                (round_index2, match_index2, self.season.schedule[round_index2][match_index2]),
+            )
+            stats.evaluated += 1
+            start = time.perf_counter()
+            improves = self._get_delta(scorer, move) < 0
+            stats.scoring_seconds += time.perf_counter() - start
+            self._count_move(improves)
+            if improves:
                 swaps += 1
+                stats.accepted += 1
+                current_score = scorer.score
+                start = time.perf_counter()
+                new_score = self._apply(scorer, move)
+                stats.scoring_seconds += time.perf_counter() - start
                 self.logger.debug(
                     "Switched matches - old score = %.2f - new score = %.2f",
                     current_score,
                     new_score,
                 )
-                current_score = new_score
             else:
                 # swap back to original matches
+                start = time.perf_counter()
                 self.season.switch_matches(round_index1, match_index1, round_index2, match_index2)
+                stats.mutation_seconds += time.perf_counter() - start
 
         return swaps
 
     @profile
-    def optimize_schedule(self) -> float:
-        """Optimize the schedule for this season."""
-        swaps = 0
+    def optimize_schedule(
+        self,
+        callback: Callable[[int, float], bool] | None = None,
+        max_seconds: float | None = None,
+        max_iterations: int | None = None,
+        target_score: float | None = None,
+        stall_limit: int | None = None,
+        rounds: Collection[int] | None = None,
+        should_stop: Callable[[], bool] | None = None,
+    ) -> float:
+        """Optimize the schedule for this season.
+
+        The optional callback gets the number of finished iterations and the current score
+        after every iteration and stops the optimization by returning True. The run also
+        stops after max_seconds, max_iterations outer iterations, when the score reaches
+        target_score or after stall_limit evaluated moves in a row without improvement.
+        Time, score and stall bounds and should_stop, which cancels the run by returning True,
+        are checked before every move. If rounds is given, only these rounds are changed.
+        """
+        self.stop_reason = None
+        self._deadline = None if max_seconds is None else time.perf_counter() + max_seconds
+        self._target_score = target_score
+        self._should_stop = should_stop
+        self._stall_limit = stall_limit
+        self._stalled = 0
+        swaps = 0 if self._resume_position is None else self._resume_position[2]
+        iteration = self._iteration
         while True:
             self.logger.info("Starting new round of optimizing ...")
+            self.stats.start_iteration()
+            start = time.perf_counter()
 
             self.logger.info("Start swapping players ...")
-            swaps += self.optimize_schedule_by_swapping_players(swaps)
+            swaps += self.optimize_schedule_by_swapping_players(swaps, rounds)
 
-            self.logger.info("Start swapping matches ...")
-            swaps += self.optimize_schedule_by_swapping_matches(swaps)
+            if self.stop_reason is None:
+                self.logger.info("Start swapping matches ...")
+                swaps += self.optimize_schedule_by_swapping_matches(swaps, rounds)
 
+            iteration += 1
+            self._iteration = iteration
+            score = self.scorer.get_score(self.season.schedule, self.season.players)
+            self.stats.finish_iteration(score, time.perf_counter() - start)
             if swaps > 0:
-                self.logger.info(
-                    "Swapped {swaps} times. The current score is: %.3f ",
-                    self.scorer.get_score(self.season.schedule, self.season.players),
-                )
-                swaps = 0
-            else:
-                self.logger.info("No more swaps feasible.")
+                self.logger.info("Swapped {swaps} times. The current score is: %.3f ", score)
+            if self.stop_reason is None:
+                if swaps == 0:
+                    self.logger.info("No more swaps feasible.")
+                    self.stop_reason = CONVERGED
+                elif max_iterations is not None and iteration >= max_iterations:
+                    self.stop_reason = MAX_ITERATIONS
+                elif callback is not None and callback(iteration, score):
+                    self.stop_reason = CALLBACK
+                # the iteration is complete, a resumed run starts with the next one
+                self._position = (PLAYERS_SWAP, 0, 0)
+                self._pass_random_state = None
+            if self.stop_reason is not None:
                 break
+            swaps = 0
 
+        self.logger.info("Optimizing stopped: %s", self.stop_reason)
+        if self.penalty is not None:
+            self.logger.info(
+                "Deviation penalty from the reference: %.3f",
+                self.penalty.get_value(self.season.schedule),
+            )
+        if self.checkpoint_path is not None:
+            self._write_checkpoint()
+        for name, stats in self.stats.get_totals().items():
+            self.logger.info(
+                "Pass %s: %i tried, %i invalid, %i evaluated, %i accepted",
+                name,
+                stats.tried,
+                stats.invalid,
+                stats.evaluated,
+                stats.accepted,
+            )
+        if self.score_cache is not None:
+            self.logger.info(
+                "Score cache: %i hits, %i misses, %i entries",
+                self.score_cache.hits,
+                self.score_cache.misses,
+                len(self.score_cache),
+            )
+        log_timings(self.logger)
         return self.scorer.get_score(self.season.schedule, self.season.players)
+
+    def repair(
+        self,
+        invalid_rounds: list[int],
+        radius: int = 2,
+        max_seconds: float | None = 1,
+        deviation_weight: float = 1000.0,
+    ) -> float:
+        """Make invalid rounds valid again with as few changes as possible.
+
+        invalid_rounds are usually returned by Season.apply_availability_change. In every
+        match with an unavailable player only this player is replaced, by the available
+        player with the best score. Afterwards only the rounds within radius of a repaired
+        round which are not fixed are optimized, so the rest of the schedule stays as it is.
+        Every match moved out of its round of the schedule before the repair costs
+        deviation_weight in this optimization. The default is far above the score change of
+        a move, so the players outside the repaired matches keep their dates.
+        """
+        published = [list(r) for r in self.season.schedule]
+        scorer = IncrementalScorer(self.season.schedule, self.season.players)
+        for round_index in invalid_rounds:
+            available_mask = self.season.available_masks[round_index]
+            for match_index, match in enumerate(self.season.schedule[round_index]):
+                kept = [p for p in get_players_of_match(match) if available_mask >> p & 1]
+                if len(kept) == 2:
+                    continue
+                candidates = [
+                    c
+                    for c in self.season.get_candidate_matches(round_index, match_index)
+                    if all(p in c for p in kept)
+                ]
+                deltas = scorer.get_slot_deltas(round_index, match_index, candidates)
+                best_candidate = candidates[int(np.argmin(deltas))]
+                self.season.change_match(round_index, match_index, best_candidate)
+                scorer.apply(((round_index, match_index, best_candidate),))
+            self.logger.info("Repaired round %s", self.season.dates[round_index])
+
+        rounds = {
+            i
+            for round_index in invalid_rounds
+            for i in range(round_index - radius, round_index + radius + 1)
+            if 0 <= i < len(self.season.schedule)
+        }
+        penalty = self.penalty
+        self.penalty = DeviationPenalty(published, deviation_weight)
+        try:
+            return self.optimize_schedule(max_seconds=max_seconds, rounds=rounds)
+        finally:
+            self.penalty = penalty
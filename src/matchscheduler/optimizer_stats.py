@@ -0,0 +1,96 @@
+"""Run metrics of the optimizer per pass and outer iteration."""
+
+import json
+from pathlib import Path
+
+PLAYERS_SWAP = "players_swap"
+INTRA_ROUND_SWAP = "intra_round_swap"
+MATCH_SWAP = "match_swap"
+
+
+class PassStats:
+    """Counts and timings of the moves of one pass.
+
+    A move is tried when it is proposed, rejected if the season refuses it as invalid,
+    evaluated if its score change is computed and accepted if it is kept.
+    """
+
+    def __init__(self):
+        self.tried = 0
+        self.invalid = 0
+        self.evaluated = 0
+        self.accepted = 0
+        self.scoring_seconds = 0.0
+        self.mutation_seconds = 0.0
+
+    @property
+    def acceptance_rate(self) -> float:
+        return self.accepted / self.evaluated if self.evaluated else 0.0
+
+    def to_dict(self) -> dict:
+        return {
+            "tried": self.tried,
+            "invalid": self.invalid,
+            "evaluated": self.evaluated,
+            "accepted": self.accepted,
+            "acceptance_rate": self.acceptance_rate,
+            "scoring_seconds": self.scoring_seconds,
+            "mutation_seconds": self.mutation_seconds,
+        }
+
+
+class IterationStats:
+    """Stats of all passes of one outer iteration and the score after it."""
+
+    def __init__(self, iteration: int):
+        self.iteration = iteration
+        self.passes = {name: PassStats() for name in (PLAYERS_SWAP, INTRA_ROUND_SWAP, MATCH_SWAP)}
+        self.score: float | None = None
+        self.seconds = 0.0
+
+    def to_dict(self) -> dict:
+        return {
+            "iteration": self.iteration,
+            "score": self.score,
+            "seconds": self.seconds,
+            "passes": {name: p.to_dict() for name, p in self.passes.items()},
+        }
+
+
+class OptimizerStats:
+    """Stats of all outer iterations of a run, optionally appended to a JSON lines file."""
+
+    def __init__(self, path: Path | None = None):
+        self.path = path
+        self.iterations: list[IterationStats] = []
+
+    def start_iteration(self) -> IterationStats:
+        self.iterations.append(IterationStats(len(self.iterations) + 1))
+        return self.iterations[-1]
+
+    def get_pass(self, name: str) -> PassStats:
+        """Get the stats of a pass in the current iteration."""
+        if not self.iterations:
+            self.start_iteration()
+        return self.iterations[-1].passes[name]
+
+    def finish_iteration(self, score: float, seconds: float) -> None:
+        current = self.iterations[-1]
+        current.score, current.seconds = score, seconds
+        if self.path is not None:
+            with open(self.path, "a", encoding="utf-8") as f:
+                f.write(json.dumps(current.to_dict()) + "\n")
+
+    def get_totals(self) -> dict[str, PassStats]:
+        """Sum up the stats of every pass over all iterations."""
+        totals = {name: PassStats() for name in (PLAYERS_SWAP, INTRA_ROUND_SWAP, MATCH_SWAP)}
+        for iteration in self.iterations:
+            for name, stats in iteration.passes.items():
+                total = totals[name]
+                total.tried += stats.tried
+                total.invalid += stats.invalid
+                total.evaluated += stats.evaluated
+                total.accepted += stats.accepted
+                total.scoring_seconds += stats.scoring_seconds
+                total.mutation_seconds += stats.mutation_seconds
+        return totals
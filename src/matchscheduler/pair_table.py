@@ -0,0 +1,49 @@
+"""Integer ids of all matches of a season."""
+
+from itertools import combinations
+
+from .match import Match
+
+
+class PairTable:
+    """Ids of all matches of num_players players with O(1) lookups in both directions.
+
+    A pair (p, q) with p < q gets its index in itertools.combinations order, like
+    get_pair_index, and a bye (p, None) gets num_pairs + p. Matches and their players are
+    created once, so lookups by id or by players don't allocate.
+    """
+
+    def __init__(self, num_players: int):
+        self.num_players = num_players
+        pairs = list(combinations(range(num_players), 2))
+        self.num_pairs = len(pairs)
+        self.matches: list[Match] = [(p, q) for p, q in pairs]
+        self.matches += [(p, None) for p in range(num_players)]
+        self.players: list[tuple[int, ...]] = [(p, q) for p, q in pairs]
+        self.players += [(p,) for p in range(num_players)]
+        # ids[p][q] for both orders, column num_players holds the byes
+        self.ids = [[-1] * (num_players + 1) for _ in range(num_players)]
+        for match_id, (p, q) in enumerate(self.matches):
+            if q is None:
+                self.ids[p][num_players] = match_id
+            else:
+                self.ids[p][q] = self.ids[q][p] = match_id
+
+    def get_id(self, match: Match) -> int:
+        q = match[1]
+        return self.ids[match[0]][self.num_players if q is None else q]
+
+    def get_match(self, p: int, q: int | None) -> Match:
+        """Get the match of two players in any order, like create_match without allocating."""
+        if p == q:
+            raise ValueError("Player Ids cannot be the same in a match.")
+        return self.matches[self.ids[p][self.num_players if q is None else q]]
+
+    def replace_player(self, match: Match, old_player: int, new_player: int) -> Match:
+        """Get the match with old_player replaced, or match itself if old_player doesn't play."""
+        p, q = match
+        if p == old_player:
+            return self.get_match(new_player, q)
+        if q == old_player:
+            return self.get_match(p, new_player)
+        return match
@@ -1,137 +1,284 @@
-import itertools
+import hashlib
+import json
+import logging
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
+from functools import partial
 from pathlib import Path
+from typing import Callable
 
 from icalendar import Calendar, Event
 from openpyxl import Workbook
 
-from .match import convert_match_to_string, create_match
-from .schedule import get_match_indizes_of_player
+from .checkpoint import atomic_path, write_atomic
+from .match import Match, convert_match_to_string
+from .player import Player
 from .season import Season
 
+PRODID = "-//MatchScheduler//MatchScheduler//EN"
+TIMEZONE = "Europe/Vienna"
+# content hashes of the exported files, relative to the export folder
+MANIFEST_NAME = ".manifest.json"
+
+# name of a file, hash of its content and a function writing it to a path
+ExportFile = tuple[str, str, Callable[[Path], None]]
+
+
+def get_content_hash(data: object) -> str:
+    """Get a hash of JSON serializable data, dates and times are written as strings."""
+    return hashlib.sha256(json.dumps(data, default=str).encode("utf-8")).hexdigest()
+
+
+def _write_bytes(render: Callable[[], bytes], path: Path) -> None:
+    path.write_bytes(render())
+
+
+def _escape(text: str) -> str:
+    """Escape a TEXT value like icalendar (RFC 5545, 3.3.11)."""
+    return (
+        text.replace("\\", "\\\\")
+        .replace(";", "\\;")
+        .replace(",", "\\,")
+        .replace("\r\n", "\\n")
+        .replace("\n", "\\n")
+        .replace("\r", "\\n")
+    )
+
+
+def _fold(line: str, limit: int = 75) -> str:
+    """Fold a content line like icalendar, every part is shorter than limit octets."""
+    if line.isascii() and len(line) < limit:
+        return line
+    parts: list[str] = []
+    current: list[str] = []
+    size = 0
+    for char in line:
+        char_size = len(char.encode("utf-8"))
+        if current and size + char_size >= limit:
+            # don't split an escaped character from its backslash
+            carry = [current.pop()] if len(current) > 1 and current[-1] == "\\" else []
+            parts.append("".join(current))
+            current, size = carry, len(carry)
+        current.append(char)
+        size += char_size
+    parts.append("".join(current))
+    return "\r\n ".join(parts)
+
 
 class Printer:
+    """Export a season as Excel workbook and as calendar of every player.
+
+    Files are written atomically and their content hashes are kept in MANIFEST_NAME in
+    the export folder. The hash of a calendar only depends on the matches of its player.
+    With incremental an export skips every file whose hash didn't change, so a
+    reoptimization only rewrites the calendars of players with changed matches.
+    """
 
     def __init__(self, season: Season):
         self.season = season
+        self.logger = logging.getLogger(__name__)
 
     # export schedule into a excel file with each round as a row
     # consisting of the date in the first column and in every next column a match
-    def export(self, folderpath: Path) -> None:
-        self.export_excel(folderpath)
-        self.export_calendar(folderpath)
-
-    def export_excel(self, folderpath: Path) -> None:
-        excel = Workbook()
-        sheet = excel.active
-        sheet.title = "Schedule"  # type: ignore
-        sheet.append(  # type: ignore
-            ["Date"] + [f"Match {i+1}" for i in range(self.season.num_courts)]
+    def export(self, folderpath: Path, incremental: bool = False) -> None:
+        self.export_excel(folderpath, incremental)
+        self.export_calendar(folderpath, fast=True, incremental=incremental)
+
+    def _export_files(
+        self,
+        folderpath: Path,
+        files: list[ExportFile],
+        incremental: bool,
+        max_workers: int | None = None,
+    ) -> int:
+        """Write the files on a thread pool, skip unchanged ones if incremental.
+
+        Returns the number of written files.
+        """
+        manifest_path = folderpath / MANIFEST_NAME
+        manifest = json.loads(manifest_path.read_bytes()) if manifest_path.exists() else {}
+
+        def write(file: ExportFile) -> bool:
+            name, content_hash, write_to = file
+            if incremental and manifest.get(name) == content_hash and (folderpath / name).exists():
+                return False
+            with atomic_path(folderpath / name) as path:
+                write_to(path)
+            return True
+
+        with ThreadPoolExecutor(max_workers) as executor:
+            written = sum(executor.map(write, files))
+        manifest.update({name: content_hash for name, content_hash, _ in files})
+        write_atomic(manifest_path, json.dumps(manifest, indent=2, sort_keys=True).encode("utf-8"))
+        self.logger.info("Exported %i of %i files to %s", written, len(files), folderpath)
+        return written
+
+    def export_excel(self, folderpath: Path, incremental: bool = False) -> None:
+        """Export the schedule, partners, matches and costs into schedule.xlsx."""
+        content_hash = get_content_hash(self.season.to_dict())
+        self._export_files(
+            folderpath, [("schedule.xlsx", content_hash, self._write_excel)], incremental
         )
+
+    def _write_excel(self, path: Path) -> None:
+        """Write the workbook to path in a single pass over the schedule per sheet.
+
+        The workbook is write-only and saved to a file, so rows are streamed out instead of
+        kept as cells or as a whole file in memory.
+        """
+        players = self.season.players
+        names = [str(p) for p in players]
+        table = self.season.pair_table
+        excel = Workbook(write_only=True)
+
+        sheet = excel.create_sheet("Schedule")
+        sheet.append(["Date"] + [f"Match {i + 1}" for i in range(self.season.num_courts)])
+        round_by_date = {d: i for i, d in enumerate(self.season.dates)}
         for d in sorted(self.season.dates + self.season.excluded_dates):
-            if d in self.season.excluded_dates:
-                sheet.append([str(d)])  # type: ignore
+            i = round_by_date.get(d)
+            if i is None:
+                sheet.append([str(d)])
             else:
-                i = self.season.dates.index(d)
-                sheet.append(  # type: ignore
-                    [str(self.season.dates[i])]
-                    + [
-                        convert_match_to_string(m, self.season.players)
-                        for m in self.season.schedule[i]
-                    ]
-                )  # type: ignore
+                sheet.append(
+                    [str(d)]
+                    + [convert_match_to_string(m, players) for m in self.season.schedule[i]]
+                )
 
         # add an additional sheet to excel workbook with columns for each player
         # and their match partners
-        sheet = excel.create_sheet("Partner by Player")  # type: ignore
-        sheet.append(["Date"] + [str(p) for p in self.season.players])  # type: ignore
-        for i, _ in enumerate(self.season.dates):
-            row = [str(self.season.dates[i])]
-            matches = self.season.schedule[i]
-            for j, _ in enumerate(self.season.players):
-                append_string = ""
-                for m in matches:
-                    if j in m:
-                        opponent = m[0] if m[0] != j else m[1]
-                        append_string += str(
-                            self.season.players[opponent] if opponent is not None else "..."
-                        )
-                        break
-                row.append(append_string)  # type: ignore
-            sheet.append(row)  # type: ignore
+        sheet = excel.create_sheet("Partner by Player")
+        sheet.append(["Date"] + names)
+        for d, round_ in zip(self.season.dates, self.season.schedule):
+            row = [str(d)] + [""] * len(players)
+            for p, q in round_:
+                row[p + 1] = "..." if q is None else names[q]
+                if q is not None:
+                    row[q + 1] = names[p]
+            sheet.append(row)
 
         # add an additional sheet to excel workbook with columns for each possible match
-        # and each row marks with an x if the match is played on that day
-        sheet = excel.create_sheet("Matches Overview")  # type: ignore
-        player_combinations = list(
-            (p, q) for p, q in itertools.combinations(range(len(self.season.players)), 2)
-        )
-        sheet.append(  # type: ignore
+        # and each row marks with an x if the match is played on that day,
+        # the column of a pair is its id in the pair table
+        sheet = excel.create_sheet("Matches Overview")
+        sheet.append(
             ["Date"]
-            + [
-                convert_match_to_string(create_match(p, q), self.season.players)
-                for p, q in player_combinations
-            ]
+            + [convert_match_to_string(m, players) for m in table.matches[: table.num_pairs]]
         )
-        for i, round in enumerate(self.season.schedule):
-            row = [str(self.season.dates[i])]
-            for player1, player2 in player_combinations:
-                append_string = ""
-                for m in round:
-                    if m == create_match(player1, player2):
-                        append_string = "x"
-                        break
-                row.append(append_string)  # type: ignore
-            sheet.append(row)  # type: ignore
+        for d, round_ in zip(self.season.dates, self.season.schedule):
+            row = [str(d)] + [""] * table.num_pairs
+            for m in round_:
+                match_id = table.get_id(m)
+                if match_id < table.num_pairs:
+                    row[match_id + 1] = "x"
+            sheet.append(row)
 
         sheet = excel.create_sheet("Costs")
-        sheet.append([""] + [str(p) for p in self.season.players])  # type: ignore
+        sheet.append([""] + names)
         cost_per_match = (
             self.season.overall_cost / (len(self.season.schedule) * self.season.num_courts) / 2
         )
-        sheet.append(  # type: ignore
-            ["Matches"]
-            + [
-                len(get_match_indizes_of_player(self.season.schedule, p))
-                for p in range(len(self.season.players))
-            ]
-        )
-        sheet.append(  # type: ignore
-            ["Cost"]
-            + [
-                len(get_match_indizes_of_player(self.season.schedule, p)) * cost_per_match
-                for p in range(len(self.season.players))
+        matches = [0] * len(players)
+        for round_ in self.season.schedule:
+            for m in round_:
+                for p in table.players[table.get_id(m)]:
+                    matches[p] += 1
+        sheet.append(["Matches"] + matches)
+        sheet.append(["Cost"] + [n * cost_per_match for n in matches])
+
+        excel.save(path)
+
+    def _get_matches_of_players(self) -> list[list[tuple[int, Match]]]:
+        """Get the round index and match of every match of every player in one pass."""
+        table = self.season.pair_table
+        matches: list[list[tuple[int, Match]]] = [[] for _ in self.season.players]
+        for round_index, round_ in enumerate(self.season.schedule):
+            for m in round_:
+                for p in table.players[table.get_id(m)]:
+                    matches[p].append((round_index, m))
+        return matches
+
+    def _render_calendar(self, player: Player, matches: list[tuple[int, Match]]) -> bytes:
+        cal = Calendar()
+        cal.add("prodid", PRODID)
+        cal.add("version", "2.0")
+        cal.add("name", f"MatchScheduler - {player.name}")
+        cal.add("X-WR-CALNAME", f"MatchScheduler - {player.name}")
+        cal.add("X-WR-TIMEZONE", TIMEZONE)
+        cal.add("X-WR-CALDESC", f"MatchScheduler - {player.name}")
+        for round_index, match in matches:
+            event = Event()
+            event.add("summary", self.season.calendar_title)
+            event.add("description", convert_match_to_string(match, self.season.players))
+            event.add(
+                "dtstart",
+                datetime.combine(self.season.dates[round_index], self.season.time_start),
+            )
+            event.add(
+                "dtend", datetime.combine(self.season.dates[round_index], self.season.time_end)
+            )
+            cal.add_component(event)
+        return cal.to_ical()
+
+    def _render_calendar_text(self, player: Player, matches: list[tuple[int, Match]]) -> bytes:
+        """Render the calendar like _render_calendar, but from text templates."""
+        # icalendar writes the properties of the calendar itself without escaping
+        name = f"MatchScheduler - {player.name}"
+        lines = [
+            "BEGIN:VCALENDAR",
+            "VERSION:2.0",
+            f"PRODID:{PRODID}",
+            f"X-WR-CALDESC:{name}",
+            f"NAME:{name}",
+            f"X-WR-CALNAME:{name}",
+            f"X-WR-TIMEZONE:{TIMEZONE}",
+        ]
+        summary = _escape(self.season.calendar_title)
+        start = self.season.time_start.strftime("T%H%M%S")
+        end = self.season.time_end.strftime("T%H%M%S")
+        for round_index, match in matches:
+            d = self.season.dates[round_index].strftime("%Y%m%d")
+            description = _escape(convert_match_to_string(match, self.season.players))
+            lines += [
+                "BEGIN:VEVENT",
+                f"SUMMARY:{summary}",
+                f"DTSTART:{d}{start}",
+                f"DTEND:{d}{end}",
+                f"DESCRIPTION:{description}",
+                "END:VEVENT",
             ]
-        )
+        lines.append("END:VCALENDAR")
+        return "".join(_fold(line) + "\r\n" for line in lines).encode("utf-8")
 
-        excel.save(folderpath / "schedule.xlsx")
-
-    def export_calendar(self, folderpath: Path) -> None:
-        # create a calendar for each player with his matches
-        for i, p in enumerate(self.season.players):
-            cal = Calendar()
-            cal.add("prodid", "-//MatchScheduler//MatchScheduler//EN")
-            cal.add("version", "2.0")
-            cal.add("name", f"MatchScheduler - {p.name}")
-            cal.add("X-WR-CALNAME", f"MatchScheduler - {p.name}")
-            cal.add("X-WR-TIMEZONE", "Europe/Vienna")
-            cal.add("X-WR-CALDESC", f"MatchScheduler - {p.name}")
-            for round_index, match_index in get_match_indizes_of_player(self.season.schedule, i):
-                event = Event()
-                event.add("summary", self.season.calendar_title)
-                event.add(
-                    "description",
-                    convert_match_to_string(
-                        self.season.schedule[round_index][match_index], self.season.players
-                    ),
-                )
-                event.add(
-                    "dtstart",
-                    datetime.combine(self.season.dates[round_index], self.season.time_start),
-                )
-                event.add(
-                    "dtend", datetime.combine(self.season.dates[round_index], self.season.time_end)
-                )
-                cal.add_component(event)
-            with open(folderpath / f"{p.name}.ics", "wb") as f:
-                f.write(cal.to_ical())
+    def export_calendar(
+        self,
+        folderpath: Path,
+        fast: bool = False,
+        max_workers: int | None = None,
+        incremental: bool = False,
+    ) -> None:
+        """Export a calendar for each player with their matches.
+
+        The matches of all players are collected in one pass over the schedule and the
+        calendars are rendered and written on a thread pool with max_workers threads. With
+        fast the calendars are rendered from text templates instead of icalendar objects,
+        which gives the same files for the fixed shape of the events.
+        """
+        matches = self._get_matches_of_players()
+        render = self._render_calendar_text if fast else self._render_calendar
+        files: list[ExportFile] = []
+        for player, player_matches in zip(self.season.players, matches):
+            content_hash = get_content_hash(
+                [
+                    player.name,
+                    self.season.calendar_title,
+                    self.season.time_start,
+                    self.season.time_end,
+                    [
+                        (self.season.dates[r], convert_match_to_string(m, self.season.players))
+                        for r, m in player_matches
+                    ],
+                ]
+            )
+            write_to = partial(_write_bytes, partial(render, player, player_matches))
+            files.append((f"{player.name}.ics", content_hash, write_to))
+        self._export_files(folderpath, files, incremental, max_workers)
@@ -1,7 +1,6 @@
 """A round of a season consisting of a list of matches."""
 
-from line_profiler import profile
-
+from .instrumentation import profile
 from .match import Match, get_players_of_match
 
 
@@ -1,8 +1,7 @@
 # """a schedule class consisting of a list of rounds
 # a schedule is valid if all rounds are valid"""
 
-from line_profiler import profile
-
+from .instrumentation import profile
 from .match import Match, get_players_of_match
 
 
@@ -28,3 +27,17 @@ def get_match_indizes_of_match(
         for match_index, match in enumerate(round)
         if match == arg_match
     ]
+
+
+@profile
+def get_opponents_by_round(
+    schedule: list[list[Match]], num_players: int
+) -> list[dict[int, int | None]]:
+    """Map the rounds of every player to the opponent, in one pass over the schedule."""
+    opponents: list[dict[int, int | None]] = [{} for _ in range(num_players)]
+    for round_index, round in enumerate(schedule):
+        for p, q in round:
+            opponents[p][round_index] = q
+            if q is not None:
+                opponents[q][round_index] = p
+    return opponents
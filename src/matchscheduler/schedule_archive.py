@@ -0,0 +1,140 @@
+"""Archive of the best distinct schedules of a season across optimization runs."""
+
+import bisect
+import hashlib
+import json
+from datetime import date
+from typing import Callable
+
+import numpy as np
+
+from .array_schedule import ArraySchedule
+from .match import Match
+from .scoring_algorithm import BoundScoringAlgorithm
+from .season import Season
+
+# names of the terms of the score
+MATCHES = "matches"
+TIMES_PLAYING = "times_playing"
+PAUSE_BETWEEN_MATCHES = "pause_between_matches"
+PAUSE_BETWEEN_PLAYING = "pause_between_playing"
+
+
+def get_schedule_hash(schedule: list[list[Match]]) -> str:
+    """Get a hash of the schedule which doesn't depend on the order of matches in a round."""
+    rounds = [sorted(r, key=lambda m: (m[0], -1 if m[1] is None else m[1])) for r in schedule]
+    return hashlib.sha256(json.dumps(rounds).encode("utf-8")).hexdigest()
+
+
+class ArchiveEntry:
+    """A schedule of the archive with its score, score components and player incidence."""
+
+    def __init__(
+        self,
+        schedule: list[list[Match]],
+        score: float,
+        components: dict[str, float],
+        dates: list[date],
+        num_players: int,
+    ):
+        self.schedule = schedule
+        self.score = score
+        self.components = components
+        self.dates = dates
+        self.hash = get_schedule_hash(schedule)
+        # incidence[p, r] is 1 if player p plays in round r
+        self.incidence = ArraySchedule.from_schedule(schedule, num_players).incidence
+
+    def get_times_playing(self, player: int, start: date, end: date) -> int:
+        """Get how often the player plays between start and end, both included."""
+        first = bisect.bisect_left(self.dates, start)
+        last = bisect.bisect_right(self.dates, end)
+        return int(self.incidence[player, first:last].sum())
+
+    def to_dict(self) -> dict:
+        return {"schedule": self.schedule, "score": self.score, "components": self.components}
+
+
+class ScheduleArchive:
+    """The size best distinct schedules of a season, sorted by score.
+
+    Schedules are distinct if their hash differs, the order of the matches inside a round
+    is ignored. Entries keep the terms of the score as components and the incidence of
+    the players, so queries don't need to rescore or rescan the schedules.
+    """
+
+    def __init__(self, season: Season, size: int = 10):
+        if size < 1:
+            raise ValueError("size must be at least 1.")
+        self.size = size
+        self.dates = list(season.dates)
+        self.players = season.players
+        self.entries: list[ArchiveEntry] = []
+        self._hashes: set[str] = set()
+        self._scorer = BoundScoringAlgorithm(season.players)
+
+    def _get_components(self, schedule: list[list[Match]]) -> dict[str, float]:
+        num_rounds = len(schedule)
+        array_schedule = ArraySchedule.from_schedule(schedule, len(self.players))
+        scorer, players = self._scorer, self.players
+        return {
+            MATCHES: num_rounds * scorer.get_std_of_all_possible_matches(array_schedule, players),
+            TIMES_PLAYING: num_rounds
+            * scorer.get_std_of_player_times_playing(array_schedule, players),
+            PAUSE_BETWEEN_MATCHES: scorer.get_std_of_pause_between_matches(array_schedule, players),
+            PAUSE_BETWEEN_PLAYING: scorer.get_std_of_pause_between_playing(array_schedule, players),
+        }
+
+    def add(self, schedule: list[list[Match]], score: float | None = None) -> bool:
+        """Add a copy of the schedule, return False if it is a duplicate or not good enough."""
+        if len(schedule) != len(self.dates):
+            raise ValueError("The schedule must have a round for every date of the season.")
+        schedule_hash = get_schedule_hash(schedule)
+        if schedule_hash in self._hashes:
+            return False
+        if score is None:
+            score = self._scorer.get_score(schedule)
+        if len(self.entries) == self.size and score >= self.entries[-1].score:
+            return False
+        schedule = [list(r) for r in schedule]
+        entry = ArchiveEntry(
+            schedule, score, self._get_components(schedule), self.dates, len(self.players)
+        )
+        bisect.insort(self.entries, entry, key=lambda e: e.score)
+        self._hashes.add(schedule_hash)
+        if len(self.entries) > self.size:
+            self._hashes.discard(self.entries.pop().hash)
+        return True
+
+    def __len__(self) -> int:
+        return len(self.entries)
+
+    def query(self, where: Callable[[ArchiveEntry], bool] | None = None) -> list[ArchiveEntry]:
+        """Get the entries for which where is True, best first."""
+        return [e for e in self.entries if where is None or where(e)]
+
+    def best(self, where: Callable[[ArchiveEntry], bool] | None = None) -> ArchiveEntry | None:
+        """Get the best entry for which where is True or None.
+
+        For example the best schedule where player 3 plays at most twice in December:
+        best(lambda e: e.get_times_playing(3, date(2024, 12, 1), date(2024, 12, 31)) <= 2)
+        """
+        return next(iter(self.query(where)), None)
+
+    def get_times_playing(self, player: int, start: date, end: date) -> np.ndarray:
+        """Get how often the player plays between start and end in every entry, best first."""
+        first = bisect.bisect_left(self.dates, start)
+        last = bisect.bisect_right(self.dates, end)
+        return np.array([e.incidence[player, first:last].sum() for e in self.entries], dtype=int)
+
+    def to_dict(self) -> dict:
+        return {"size": self.size, "entries": [e.to_dict() for e in self.entries]}
+
+    @classmethod
+    def from_dict(cls, data: dict, season: Season) -> "ScheduleArchive":
+        """Create an archive of the season from a dictionary, season gives dates and players."""
+        archive = cls(season, data["size"])
+        for entry in data["entries"]:
+            schedule = [[season.pair_table.get_match(*m) for m in r] for r in entry["schedule"]]
+            archive.add(schedule, entry["score"])
+        return archive
@@ -0,0 +1,114 @@
+"""Changes between two schedules of a season, per player and date."""
+
+from datetime import date
+
+import numpy as np
+
+from .incremental_scorer import Move
+from .match import Match
+from .schedule import get_opponents_by_round
+from .season import Season
+
+
+class PlayerChange:
+    """The dates a player plays in one schedule but not in the other and changed opponents.
+
+    changed_opponents holds (date, old opponent, new opponent) for the dates the player
+    plays in both schedules, an opponent of None means the player plays alone.
+    """
+
+    def __init__(self, player_index: int):
+        self.player_index = player_index
+        self.added_dates: list[date] = []
+        self.removed_dates: list[date] = []
+        self.changed_opponents: list[tuple[date, int | None, int | None]] = []
+
+    def __bool__(self) -> bool:
+        return bool(self.added_dates or self.removed_dates or self.changed_opponents)
+
+    def to_dict(self) -> dict:
+        return {
+            "player_index": self.player_index,
+            "added_dates": [str(d) for d in self.added_dates],
+            "removed_dates": [str(d) for d in self.removed_dates],
+            "changed_opponents": [[str(d), p, q] for d, p, q in self.changed_opponents],
+        }
+
+
+def diff(season_a: Season, season_b: Season) -> dict[int, PlayerChange]:
+    """Get the changes of every player whose dates or opponents differ from a to b.
+
+    Rounds are compared by date, so both seasons may have different dates.
+    """
+    if len(season_a.players) != len(season_b.players):
+        raise ValueError("Both seasons must have the same players.")
+    num_players = len(season_a.players)
+    opponents_a = get_opponents_by_round(season_a.schedule, num_players)
+    opponents_b = get_opponents_by_round(season_b.schedule, num_players)
+    changes = {}
+    for p in range(num_players):
+        by_date_a = {season_a.dates[r]: q for r, q in opponents_a[p].items()}
+        by_date_b = {season_b.dates[r]: q for r, q in opponents_b[p].items()}
+        change = PlayerChange(p)
+        change.added_dates = sorted(by_date_b.keys() - by_date_a.keys())
+        change.removed_dates = sorted(by_date_a.keys() - by_date_b.keys())
+        change.changed_opponents = [
+            (d, by_date_a[d], by_date_b[d])
+            for d in sorted(by_date_a.keys() & by_date_b.keys())
+            if by_date_a[d] != by_date_b[d]
+        ]
+        if change:
+            changes[p] = change
+    return changes
+
+
+def format_changes(changes: dict[int, PlayerChange], season: Season) -> str:
+    """Format the changes as a report with one line per player, names are taken from season."""
+
+    def name(p: int | None) -> str:
+        return "nobody" if p is None else season.players[p].name
+
+    lines = []
+    for p, change in sorted(changes.items()):
+        parts = [f"+{d}" for d in change.added_dates]
+        parts += [f"-{d}" for d in change.removed_dates]
+        parts += [f"{d}: {name(a)} -> {name(b)}" for d, a, b in change.changed_opponents]
+        lines.append(f"{name(p)}: " + ", ".join(parts))
+    return "\n".join(lines)
+
+
+class DeviationPenalty:
+    """Penalty of weight for every match which is not in the same round of a reference schedule.
+
+    The position of a match inside its round is ignored, so swapping matches of a round is
+    free. The penalty is additive over the slots of a round, so the change of a move only
+    depends on the old and new matches of its slots.
+    """
+
+    def __init__(self, reference: list[list[Match]], weight: float = 1.0):
+        self.reference = [set(r) for r in reference]
+        self.weight = weight
+
+    def get_value(self, schedule: list[list[Match]]) -> float:
+        if len(schedule) != len(self.reference):
+            raise ValueError("The schedule must have as many rounds as the reference.")
+        return self.weight * sum(
+            m not in reference for r, reference in zip(schedule, self.reference) for m in r
+        )
+
+    def get_move_delta(self, schedule: list[list[Match]], move: Move) -> float:
+        """Get the change of the penalty if move is applied to schedule."""
+        return self.weight * sum(
+            (match not in self.reference[r]) - (schedule[r][m] not in self.reference[r])
+            for r, m, match in move
+        )
+
+    def get_slot_deltas(
+        self, round_index: int, old_match: Match, candidates: list[Match]
+    ) -> np.ndarray:
+        """Get the change of the penalty for every candidate replacing old_match."""
+        reference = self.reference[round_index]
+        return self.weight * (
+            np.array([c not in reference for c in candidates], dtype=float)
+            - (old_match not in reference)
+        )
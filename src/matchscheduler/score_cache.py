@@ -0,0 +1,93 @@
+"""Memoization of scores keyed by a Zobrist hash of the schedule."""
+
+import random
+from collections import OrderedDict
+
+from .incremental_scorer import Move
+from .instrumentation import profile
+from .match import Match
+from .player import Player
+from .scoring_algorithm import ScoringAlgorithm
+
+
+class ScoreCache:
+    """Bounded LRU cache of scores keyed by a Zobrist hash of the schedule.
+
+    The hash is the XOR of a random 64 bit key per (round, match) placement. The position of
+    a match inside its round does not change the score and is left out, so permutations of
+    a round share the hash. A move changes the hash by XOR-ing out the old and XOR-ing in the
+    new matches of its slots. The keys are drawn from an own generator, so caching does not
+    change the global random sequence.
+    """
+
+    def __init__(self, max_size: int = 100_000, seed: int = 0):
+        if max_size < 1:
+            raise ValueError("max_size must be at least 1.")
+        self.max_size = max_size
+        self.hits = 0
+        self.misses = 0
+        self._scores: OrderedDict[int, float] = OrderedDict()
+        self._keys: dict[tuple[int, Match], int] = {}
+        self._rng = random.Random(seed)
+
+    def _get_key(self, round_index: int, match: Match) -> int:
+        key = self._keys.get((round_index, match))
+        if key is None:
+            key = self._keys[round_index, match] = self._rng.getrandbits(64)
+        return key
+
+    def get_hash(self, schedule: list[list[Match]]) -> int:
+        value = 0
+        for round_index, round_ in enumerate(schedule):
+            for match in round_:
+                value ^= self._get_key(round_index, match)
+        return value
+
+    def get_move_hash(self, value: int, schedule: list[list[Match]], move: Move) -> int:
+        """Get the hash after applying move to schedule, whose hash is value."""
+        for round_index, match_index, match in move:
+            value ^= self._get_key(round_index, schedule[round_index][match_index])
+            value ^= self._get_key(round_index, match)
+        return value
+
+    def get(self, value: int) -> float | None:
+        score = self._scores.get(value)
+        if score is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        self._scores.move_to_end(value)
+        return score
+
+    def put(self, value: int, score: float) -> None:
+        self._scores[value] = score
+        self._scores.move_to_end(value)
+        if len(self._scores) > self.max_size:
+            self._scores.popitem(last=False)
+
+    def __len__(self) -> int:
+        return len(self._scores)
+
+    @property
+    def hit_rate(self) -> float:
+        lookups = self.hits + self.misses
+        return self.hits / lookups if lookups else 0.0
+
+
+class CachedScoringAlgorithm(ScoringAlgorithm):
+    """ScoringAlgorithm which only scores schedules it has not seen before.
+
+    The cache is only valid for one list of players.
+    """
+
+    def __init__(self, cache: ScoreCache | None = None):
+        self.cache = ScoreCache() if cache is None else cache
+
+    @profile
+    def get_score(self, schedule: list[list[Match]], players: list[Player]) -> float:
+        value = self.cache.get_hash(schedule)
+        score = self.cache.get(value)
+        if score is None:
+            score = super().get_score(schedule, players)
+            self.cache.put(value, score)
+        return score
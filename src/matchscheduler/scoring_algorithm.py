@@ -1,16 +1,39 @@
 import itertools
+import math
 
 import numpy as np
-from line_profiler import profile
 
-from .match import create_match
+from .array_schedule import ArraySchedule
+from .instrumentation import profile
+from .match import Match, create_match
 from .player import Player
 from .schedule import get_match_indizes_of_match, get_match_indizes_of_player
 
 
+def get_std_of_pause_from_squares(num_gaps: int, squares: int, num_rounds: int) -> float:
+    """Get the standard deviation of pauses from their number and sum of squares.
+
+    The pauses always sum up to num_rounds, so the variance is exactly
+    (num_gaps * squares - num_rounds**2) / num_gaps**2 in integer arithmetic.
+    """
+    return math.sqrt(num_gaps * squares - num_rounds**2) / num_gaps
+
+
+def get_std_of_pause(rounds_playing: list[int], num_rounds: int) -> float:
+    """Get the standard deviation of the pauses of a player or a pair.
+
+    The pauses are the gaps between the start of the season, all sorted rounds playing and
+    the end of the season. Playing at most once counts as a pause of num_rounds.
+    """
+    if len(rounds_playing) <= 1:
+        return num_rounds
+    gaps = [b - a for a, b in zip([0] + rounds_playing, rounds_playing + [num_rounds])]
+    return get_std_of_pause_from_squares(len(gaps), sum(g * g for g in gaps), num_rounds)
+
+
 class ScoringAlgorithm:
     @profile
-    def get_score(self, schedule: list[list[int]], players: list[Player]) -> float:
+    def get_score(self, schedule: list[list[Match]], players: list[Player]) -> float:
         """Get the score of this schedule."""
         num_rounds = len(schedule)
         score = (
@@ -27,7 +50,7 @@ class ScoringAlgorithm:
 
     @profile
     def get_std_of_player_times_playing(
-        self, schedule: list[list[int]], players: list[Player]
+        self, schedule: list[list[Match]], players: list[Player]
     ) -> float:
         """Get the standard deviation of times playing for this schedule."""
         weighted_times_playing = [
@@ -37,7 +60,7 @@ class ScoringAlgorithm:
 
     @profile
     def get_std_of_all_possible_matches(
-        self, schedule: list[list[int]], players: list[Player]
+        self, schedule: list[list[Match]], players: list[Player]
     ) -> float:
         """Get the standard deviation of all possible matches for this schedule."""
         all_possible_matches: dict[tuple[int, int], float] = {}
@@ -51,29 +74,18 @@ class ScoringAlgorithm:
 
     @profile
     def get_std_of_pause_between_playing(
-        self, schedule: list[list[int]], players: list[Player]
+        self, schedule: list[list[Match]], players: list[Player]
     ) -> float:
         """Get the standard deviation of pause between playing for this schedule."""
         pause_between_playing: list[float] = [0] * len(players)
         for i in range(len(players)):
             rounds_playing = [x[0] for x in get_match_indizes_of_player(schedule, i)]
-            if len(rounds_playing) > 1:
-                pause_between_playing[i] = float(
-                    np.std(
-                        [
-                            rounds_playing[j + 1] - rounds_playing[j]
-                            for j in range(len(rounds_playing) - 1)
-                        ]
-                        + [rounds_playing[0], len(schedule) - rounds_playing[-1]]
-                    )
-                )
-            else:
-                pause_between_playing[i] = len(schedule)
+            pause_between_playing[i] = get_std_of_pause(rounds_playing, len(schedule))
         return np.sum(pause_between_playing)
 
     @profile
     def get_std_of_pause_between_matches(
-        self, schedule: list[list[int]], players: list[Player]
+        self, schedule: list[list[Match]], players: list[Player]
     ) -> float:
         """Get the standard deviation of pause between matches for this schedule."""
         std_pause_between_matches: dict[tuple[int, int], float] = {}
@@ -82,16 +94,143 @@ class ScoringAlgorithm:
             if p != q:
                 matches_playing = get_match_indizes_of_match(schedule, create_match(p, q))
                 rounds_playing = sorted([x[0] for x in matches_playing])
-                if len(rounds_playing) > 1:
-                    std_pause_between_matches[p, q] = float(
-                        np.std(
-                            [
-                                rounds_playing[j + 1] - rounds_playing[j]
-                                for j in range(len(rounds_playing) - 1)
-                            ]
-                            + [rounds_playing[0], len(schedule) - rounds_playing[-1]]
-                        )
-                    )
-                else:
-                    std_pause_between_matches[p, q] = len(schedule)
+                std_pause_between_matches[p, q] = get_std_of_pause(rounds_playing, len(schedule))
         return np.sum(list(std_pause_between_matches.values()))
+
+
+def get_std_of_pauses(
+    entities: np.ndarray, rounds: np.ndarray, num_entities: int, num_rounds: int
+) -> np.ndarray:
+    """Get the standard deviation of pauses for every entity (player or pair) at once.
+
+    The pauses of an entity are the gaps between the start of the season, all rounds it
+    occurs in and the end of the season. Entities occuring at most once get num_rounds.
+    """
+    order = np.lexsort((rounds, entities))
+    entities, rounds = entities[order], rounds[order]
+    counts = np.bincount(entities, minlength=num_entities)
+
+    is_first = np.ones(len(entities), dtype=bool)
+    is_first[1:] = entities[1:] != entities[:-1]
+    is_last = np.ones(len(entities), dtype=bool)
+    is_last[:-1] = is_first[1:]
+    previous = np.zeros_like(rounds)
+    previous[1:] = rounds[:-1]
+    previous[is_first] = 0
+    gaps = rounds - previous
+    tail_gaps = np.full(num_entities, num_rounds, dtype=float)
+    tail_gaps[entities[is_last]] = num_rounds - rounds[is_last]
+
+    squares = np.bincount(entities, weights=gaps**2, minlength=num_entities)
+    squares += tail_gaps**2
+    # same formula as get_std_of_pause_from_squares, exact for integer squares
+    num_gaps = counts + 1
+    return np.where(
+        counts > 1,
+        np.sqrt(num_gaps * squares - num_rounds**2) / num_gaps,
+        float(num_rounds),
+    )
+
+
+class VectorizedScoringAlgorithm(ScoringAlgorithm):
+    """ScoringAlgorithm computing all terms with batched numpy operations.
+
+    Schedules are converted to an ArraySchedule once per get_score call.
+    """
+
+    def _to_array(
+        self, schedule: list[list[Match]] | ArraySchedule, players: list[Player]
+    ) -> ArraySchedule:
+        if isinstance(schedule, ArraySchedule):
+            return schedule
+        return ArraySchedule.from_schedule(schedule, len(players))
+
+    def _get_pair_weights(self, players: list[Player]) -> np.ndarray:
+        weights = np.array([p.weight for p in players], dtype=float)
+        return np.outer(weights, weights)[np.triu_indices(len(players), 1)]
+
+    @profile
+    def get_score(
+        self, schedule: list[list[Match]] | ArraySchedule, players: list[Player]
+    ) -> float:
+        return super().get_score(self._to_array(schedule, players), players)  # type: ignore
+
+    def get_std_of_player_times_playing(
+        self, schedule: list[list[Match]] | ArraySchedule, players: list[Player]
+    ) -> float:
+        array_schedule = self._to_array(schedule, players)
+        weights = np.array([p.weight for p in players], dtype=float)
+        return float(np.std(array_schedule.incidence.sum(axis=1) / weights))
+
+    def get_std_of_all_possible_matches(
+        self, schedule: list[list[Match]] | ArraySchedule, players: list[Player]
+    ) -> float:
+        array_schedule = self._to_array(schedule, players)
+        pair_weights = self._get_pair_weights(players)
+        _, pairs = array_schedule.get_pair_occurrences()
+        return float(np.std(np.bincount(pairs, minlength=len(pair_weights)) / pair_weights))
+
+    def get_std_of_pause_between_playing(
+        self, schedule: list[list[Match]] | ArraySchedule, players: list[Player]
+    ) -> float:
+        array_schedule = self._to_array(schedule, players)
+        rounds, entities = array_schedule.get_player_occurrences()
+        return float(np.sum(get_std_of_pauses(entities, rounds, len(players), len(array_schedule))))
+
+    def get_std_of_pause_between_matches(
+        self, schedule: list[list[Match]] | ArraySchedule, players: list[Player]
+    ) -> float:
+        array_schedule = self._to_array(schedule, players)
+        rounds, entities = array_schedule.get_pair_occurrences()
+        num_pairs = len(players) * (len(players) - 1) // 2
+        return float(np.sum(get_std_of_pauses(entities, rounds, num_pairs, len(array_schedule))))
+
+
+class BoundScoringAlgorithm(VectorizedScoringAlgorithm):
+    """VectorizedScoringAlgorithm bound to a list of players.
+
+    The weights of the players and pairs and the index of every pair are computed once, so
+    get_score only collects the rounds, players and pairs of the schedule and reduces them
+    with numpy.
+    """
+
+    def __init__(self, players: list[Player]):
+        self.players = players
+        num_players = len(players)
+        self.player_weights = np.array([p.weight for p in players], dtype=float)
+        self.pair_weights = self._get_pair_weights(players)
+        # pair_indizes[p, q] is the index of the pair in itertools.combinations order
+        self.pair_indizes = np.full((num_players, num_players), -1, dtype=np.intp)
+        p, q = np.triu_indices(num_players, 1)
+        self.pair_indizes[p, q] = self.pair_indizes[q, p] = np.arange(len(p))
+
+    @profile
+    def get_score(
+        self, schedule: list[list[Match]] | ArraySchedule, players: list[Player] | None = None
+    ) -> float:
+        if players is not None and players is not self.players:
+            raise ValueError("The scoring algorithm is bound to other players.")
+        if isinstance(schedule, ArraySchedule):
+            return super().get_score(schedule, self.players)
+        num_rounds = len(schedule)
+        matches = [(r, m[0], m[1]) for r, round_ in enumerate(schedule) for m in round_]
+        rounds = np.array([m[0] for m in matches], dtype=np.intp)
+        first = np.array([m[1] for m in matches], dtype=np.intp)
+        second = np.array([-1 if m[2] is None else m[2] for m in matches], dtype=np.intp)
+        is_pair = second >= 0
+        player_rounds = np.concatenate((rounds, rounds[is_pair]))
+        player_entities = np.concatenate((first, second[is_pair]))
+        pair_rounds = rounds[is_pair]
+        pair_entities = self.pair_indizes[first[is_pair], second[is_pair]]
+
+        num_players, num_pairs = len(self.player_weights), len(self.pair_weights)
+        player_counts = np.bincount(player_entities, minlength=num_players)
+        pair_counts = np.bincount(pair_entities, minlength=num_pairs)
+        return (
+            num_rounds * float(np.std(pair_counts / self.pair_weights))
+            + num_rounds * float(np.std(player_counts / self.player_weights))
+            + float(np.sum(get_std_of_pauses(pair_entities, pair_rounds, num_pairs, num_rounds)))
+            + float(
+                np.sum(get_std_of_pauses(player_entities, player_rounds, num_players, num_rounds))
+            )
+        )
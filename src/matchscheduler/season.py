@@ -3,18 +3,43 @@
 import itertools
 import logging
 import random
+from collections import Counter
 from datetime import date, time, timedelta
 
-from line_profiler import profile
-
-from .match import (Match, can_match_be_added, create_match,
-                    replace_player_in_match)
+from .array_schedule import ArraySchedule
+from .instrumentation import profile
+from .match import Match, can_match_be_added, create_match, get_players_of_match
+from .pair_table import PairTable
 from .player import Player
-from .round import get_players_of_round
+
+# ways to construct the initial schedule
+RANDOM_CONSTRUCTION = "random"
+GREEDY_CONSTRUCTION = "greedy"
+
+
+def get_match_mask(match: Match) -> int:
+    """Get the bitmask of the players of a match, bit i is set if player i plays."""
+    return (1 << match[0]) | (0 if match[1] is None else 1 << match[1])
+
+
+def get_round_mask(round_: list[Match]) -> int:
+    mask = 0
+    for match in round_:
+        mask |= get_match_mask(match)
+    return mask
 
 
 class Season:
-    """A season of matches."""
+    """A season of matches.
+
+    The availability of the players is indexed per round as bitmask (available_masks) and
+    list (available_players), the players of every round as bitmask (used_masks). The masks
+    are updated by the mutation methods and rebuilt when schedule is assigned, so rows of
+    the schedule must not be changed in place otherwise.
+
+    If a schedule is given, it is used instead of constructing one and the rounds with
+    too few available players are fixed, like on construction.
+    """
 
     def __init__(
         self,
@@ -27,6 +52,9 @@ class Season:
         excluded_dates: list[str],
         overall_cost: float = 0,
         calendar_title: str = "Tennisabo",
+        construction: str = RANDOM_CONSTRUCTION,
+        schedule: list[list[Match]] | None = None,
+        fixed_rounds: list[int] | None = None,
     ):
         self.players = players
         self.start = start
@@ -47,31 +75,65 @@ class Season:
                 self.dates.append(d)
             d += timedelta(days=7)
 
-        self.schedule = self._generate_schedule()
+        self.available_players = [
+            [i for i, p in enumerate(self.players) if d not in p.cannot_play] for d in self.dates
+        ]
+        self.available_masks = [sum(1 << i for i in players) for players in self.available_players]
+        self.used_masks: list[int] = []
+        self.pair_table = PairTable(len(players))
+        if schedule is not None:
+            if len(schedule) != len(self.dates):
+                raise ValueError("The schedule must have a round for every date.")
+            self.schedule = [[self.pair_table.get_match(*m) for m in r] for r in schedule]
+            # rounds with too few available players and the given ones, e.g. played rounds
+            self.fixed_rounds = sorted(
+                {i for i, p in enumerate(self.available_players) if len(p) < number_courts * 2}
+                | set(fixed_rounds or [])
+            )
+        elif construction == RANDOM_CONSTRUCTION:
+            self.schedule = self._generate_schedule()
+        elif construction == GREEDY_CONSTRUCTION:
+            self.schedule = self._generate_greedy_schedule()
+        else:
+            raise ValueError(f"Unknown construction {construction}.")
         self.logger = logging.getLogger(__name__)
 
+    @property
+    def schedule(self) -> list[list[Match]]:
+        return self._schedule
+
+    @schedule.setter
+    def schedule(self, schedule: list[list[Match]]) -> None:
+        self._schedule = schedule
+        self.used_masks = [get_round_mask(r) for r in schedule]
+
     def _generate_schedule(self) -> list[list[Match]]:
         season = []
-        for i, d in enumerate(self.dates):
-            r, partial = self._generate_valid_round(d)
+        for i in range(len(self.dates)):
+            r, partial = self._generate_valid_round(i)
             season.append(r)
             if partial:
                 self.fixed_rounds.append(i)
         return season
 
-    def _generate_valid_round(self, match_date: date) -> tuple[list[Match], bool]:
+    def _generate_valid_round(self, round_index: int) -> tuple[list[Match], bool]:
         rounds: list[Match] = []
-        possible_player_idx = [
-            i for i, _ in enumerate(self.players) if match_date not in _.cannot_play
-        ]
+        possible_player_idx = list(self.available_players[round_index])
         if len(possible_player_idx) >= self.num_courts * 2:
             for _ in range(self.num_courts):
-                rounds.append(self._generate_valid_match(match_date, rounds))
+                rounds.append(self._generate_valid_match(round_index, rounds))
             if len(rounds) == self.num_courts:
                 return rounds, False
             raise ValueError()
-        # generate partial round
-        round = []
+        return self._complete_partial_round(round_index, []), True
+
+    def _complete_partial_round(self, round_index: int, round_: list[Match]) -> list[Match]:
+        """Pair the available players of a partial round who are not in round_ yet."""
+        used_mask = get_round_mask(round_)
+        possible_player_idx = [
+            p for p in self.available_players[round_index] if not used_mask >> p & 1
+        ]
+        round = list(round_)
         random.shuffle(possible_player_idx)
         while len(possible_player_idx) > 0:
             if len(possible_player_idx) >= 2:
@@ -79,10 +141,59 @@ class Season:
                 round.append(create_match(x, y))
             elif len(possible_player_idx) == 1:
                 round.append(create_match(possible_player_idx.pop(), None))
-        return round, True
+        return round
+
+    def _generate_greedy_schedule(self) -> list[list[Match]]:
+        """Build the rounds one after another from the counts of the rounds before.
+
+        The players with the fewest weighted appearances and the longest pause play and
+        each of them is paired with the partner of the fewest weighted meetings so far.
+        """
+        appearances = [0.0] * len(self.players)
+        last_rounds = [-1] * len(self.players)
+        meetings: Counter[Match] = Counter()
+        season = []
+        for i in range(len(self.dates)):
+            if len(self.available_players[i]) >= self.num_courts * 2:
+                r = self._generate_greedy_round(i, appearances, last_rounds, meetings)
+            else:
+                r, _ = self._generate_valid_round(i)
+                self.fixed_rounds.append(i)
+            for match in r:
+                for p in get_players_of_match(match):
+                    appearances[p] += 1 / self.players[p].weight
+                    last_rounds[p] = i
+                if match[1] is not None:
+                    meetings[match] += 1
+            season.append(r)
+        return season
+
+    def _generate_greedy_round(
+        self,
+        round_index: int,
+        appearances: list[float],
+        last_rounds: list[int],
+        meetings: Counter[Match],
+    ) -> list[Match]:
+        players = list(self.available_players[round_index])
+        # shuffle first, so ties are broken randomly by the stable sort
+        random.shuffle(players)
+        players.sort(key=lambda p: (appearances[p], last_rounds[p]))
+        chosen = players[: self.num_courts * 2]
+        round_ = []
+        while chosen:
+            p = chosen.pop(0)
+            q = min(
+                chosen,
+                key=lambda q: meetings[create_match(p, q)]
+                / (self.players[p].weight * self.players[q].weight),
+            )
+            chosen.remove(q)
+            round_.append(create_match(p, q))
+        return round_
 
-    def _generate_valid_match(self, match_date: date, other_matches: list[Match]) -> Match:
-        indizes = [i for i, _ in enumerate(self.players) if match_date not in _.cannot_play]
+    def _generate_valid_match(self, round_index: int, other_matches: list[Match]) -> Match:
+        indizes = list(self.available_players[round_index])
         random.shuffle(indizes)
         for p, q in itertools.combinations(indizes, 2):
             match = create_match(p, q)
@@ -90,24 +201,54 @@ class Season:
                 return match
         raise ValueError()
 
+    def _can_replace(self, round_index: int, old_match: Match, new_match: Match) -> bool:
+        """Check if a valid round stays valid if old_match is replaced by new_match."""
+        if new_match[1] is None:
+            return False
+        new_mask = get_match_mask(new_match)
+        others = self.used_masks[round_index] & ~get_match_mask(old_match)
+        return not new_mask & (others | ~self.available_masks[round_index])
+
+    def _replace(self, round_index: int, match_index: int, match: Match) -> None:
+        old_mask = get_match_mask(self.schedule[round_index][match_index])
+        self.schedule[round_index][match_index] = match
+        used_mask = self.used_masks[round_index] & ~old_mask
+        self.used_masks[round_index] = used_mask | get_match_mask(match)
+
     @profile
     def change_match(self, round_index: int, match_index: int, match: Match) -> bool:
-        if round_index in self.fixed_rounds:
+        if round_index in self.fixed_rounds or not self._can_replace(
+            round_index, self.schedule[round_index][match_index], match
+        ):
             return False
-        old_match = self.schedule[round_index][match_index]
-        self.schedule[round_index][match_index] = match
-        if self.check_if_round_is_valid(round_index):
-            return True
-        self.schedule[round_index][match_index] = old_match
-        return False
+        self._replace(round_index, match_index, match)
+        return True
+
+    @profile
+    def get_candidate_matches(self, round_index: int, match_index: int) -> list[Match]:
+        """Get all matches which can replace the match at the slot and keep the round valid."""
+        if round_index in self.fixed_rounds:
+            return []
+        current_match = self.schedule[round_index][match_index]
+        used_mask = self.used_masks[round_index] & ~get_match_mask(current_match)
+        available_players = [
+            p for p in self.available_players[round_index] if not used_mask >> p & 1
+        ]
+        # the players are sorted, so ids[p][q] is the id of the match (p, q)
+        ids, matches = self.pair_table.ids, self.pair_table.matches
+        current_id = self.pair_table.get_id(current_match)
+        return [
+            matches[ids[p][q]]
+            for p, q in itertools.combinations(available_players, 2)
+            if ids[p][q] != current_id
+        ]
 
     @profile
     def check_if_round_is_valid(self, round_index: int) -> bool:
-        players = get_players_of_round(self.schedule[round_index])
-        if len(players) != self.num_courts * 2:
+        mask = get_round_mask(self.schedule[round_index])
+        if mask.bit_count() != self.num_courts * 2:
             return False
-        match_date = self.dates[round_index]
-        return not any(match_date in self.players[p].cannot_play for p in players)
+        return not mask & ~self.available_masks[round_index]
 
     def check_schedule_is_valid(self) -> bool:
         for i in range(len(self.schedule)):
@@ -117,30 +258,76 @@ class Season:
 
     @profile
     def swap_players_of_existing_matches(self, round_index: int, p: int, q: int) -> bool:
+        # swapping inside a round keeps the players of the round, so the masks stay the same
         if round_index in self.fixed_rounds:
             return False
-        for i, match in enumerate(self.schedule[round_index]):
-            self.schedule[round_index][i], swapped = replace_player_in_match(match, p, q)
-            if swapped:
-                continue
-            self.schedule[round_index][i], swapped = replace_player_in_match(match, q, p)
+        round_ = self.schedule[round_index]
+        for i, match in enumerate(round_):
+            if p in match:
+                round_[i] = self.pair_table.replace_player(match, p, q)
+            elif q in match:
+                round_[i] = self.pair_table.replace_player(match, q, p)
         return True
 
     @profile
     def switch_matches(self, round1: int, match1: int, round2: int, match2: int) -> bool:
         if round1 in self.fixed_rounds or round2 in self.fixed_rounds:
             return False
-        self.schedule[round1][match1], self.schedule[round2][match2] = (
-            self.schedule[round2][match2],
-            self.schedule[round1][match1],
-        )
-        if self.check_if_round_is_valid(round1) and self.check_if_round_is_valid(round2):
+        m1, m2 = self.schedule[round1][match1], self.schedule[round2][match2]
+        if round1 == round2:
+            # switching inside a round keeps the players of the round
+            self.schedule[round1][match1], self.schedule[round2][match2] = m2, m1
             return True
-        self.schedule[round1][match1], self.schedule[round2][match2] = (
-            self.schedule[round2][match2],
-            self.schedule[round1][match1],
-        )
-        return False
+        if not (self._can_replace(round1, m1, m2) and self._can_replace(round2, m2, m1)):
+            return False
+        self._replace(round1, match1, m2)
+        self._replace(round2, match2, m1)
+        return True
+
+    def apply_availability_change(
+        self, player_index: int, dates: list[date], played_until: date | None = None
+    ) -> list[int]:
+        """Add dates a player cannot play and get the rounds which became invalid.
+
+        Rounds before played_until were already played and are fixed, they never change.
+        A later round which has too few available players left becomes a partial round and
+        is fixed, like on creation: its other matches are kept and the remaining available
+        players are paired. The other rounds the player was scheduled for are returned
+        unchanged, Optimizer.repair makes them valid again.
+        """
+        if played_until is not None:
+            for i, d in enumerate(self.dates):
+                if d < played_until and i not in self.fixed_rounds:
+                    self.fixed_rounds.append(i)
+        self.players[player_index].cannot_play.update(dates)
+        invalid_rounds = []
+        for i, d in enumerate(self.dates):
+            if d not in self.players[player_index].cannot_play:
+                continue
+            self.available_players[i] = [p for p in self.available_players[i] if p != player_index]
+            self.available_masks[i] &= ~(1 << player_index)
+            if not self.used_masks[i] >> player_index & 1:
+                continue
+            if played_until is not None and d < played_until:
+                self.logger.warning(
+                    "Round %s was already played and is not changed.", self.dates[i]
+                )
+                continue
+            if len(self.available_players[i]) >= self.num_courts * 2 and i not in self.fixed_rounds:
+                invalid_rounds.append(i)
+                continue
+            kept = [m for m in self.schedule[i] if m[1] is not None and player_index not in m]
+            self.schedule[i] = self._complete_partial_round(i, kept)
+            self.used_masks[i] = get_round_mask(self.schedule[i])
+            if i not in self.fixed_rounds:
+                self.fixed_rounds.append(i)
+        return invalid_rounds
+
+    def to_array_schedule(self) -> ArraySchedule:
+        return ArraySchedule.from_schedule(self.schedule, len(self.players), self.num_courts)
+
+    def set_array_schedule(self, array_schedule: ArraySchedule) -> None:
+        self.schedule = array_schedule.to_schedule()
 
     def to_dict(self) -> dict:
         return {
@@ -154,6 +341,7 @@ class Season:
             "overall_cost": self.overall_cost,
             "calendar_title": self.calendar_title,
             "schedule": self.schedule,
+            "fixed_rounds": sorted(self.fixed_rounds),
         }
 
     @classmethod
@@ -167,7 +355,7 @@ class Season:
         excluded_dates = data["excluded_dates"]
         calendar_title = data["calendar_title"]
         overall_cost = data["overall_cost"]
-        instance = cls(
+        return cls(
             players,
             start,
             end,
@@ -177,13 +365,17 @@ class Season:
             excluded_dates,
             overall_cost,
             calendar_title,
+            schedule=data["schedule"],
+            fixed_rounds=data.get("fixed_rounds"),
         )
-        instance.schedule = [[create_match(y[0], y[1]) for y in x] for x in data["schedule"]]
-        return instance
 
     @classmethod
-    def create_from_settings(cls, data: dict) -> "Season":
-        """Create a Season from a dictionary."""
+    def create_from_settings(cls, data: dict, construction: str | None = None) -> "Season":
+        """Create a Season from a dictionary.
+
+        The construction of the initial schedule is taken from data["abo"]["construction"]
+        if it is not given and defaults to random.
+        """
         players = [Player.from_dict(p) for p in data["players"]]
         start = date.fromisoformat(data["abo"]["start"])
         end = date.fromisoformat(data["abo"]["end"])
@@ -193,6 +385,8 @@ class Season:
         number_courts = data["abo"]["number_courts"]
         overall_cost = data["abo"]["overall_cost"]
         calendar_title = data["calendar"]["title"]
+        if construction is None:
+            construction = str(data["abo"].get("construction", RANDOM_CONSTRUCTION))
         return cls(
             players,
             start,
@@ -203,4 +397,5 @@ class Season:
             excluded_dates,
             overall_cost,
             calendar_title,
+            construction,
         )
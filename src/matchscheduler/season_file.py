@@ -0,0 +1,67 @@
+"""Compact binary file format of a season.
+
+A file starts with MAGIC, the format version and the length of a JSON header, which holds
+everything of Season.to_dict except the schedule plus the number of rounds. The schedule
+follows as little endian int16 array of shape (rounds, courts, 2) in the layout of
+ArraySchedule, aligned to ALIGNMENT bytes, so it can be memory mapped.
+"""
+
+import json
+import struct
+from pathlib import Path
+
+import numpy as np
+
+from .array_schedule import BYE
+from .checkpoint import write_atomic
+from .season import Season
+
+MAGIC = b"MSSEASON"
+VERSION = 1
+ALIGNMENT = 8
+# magic, version and length of the header including its padding
+_PREFIX = struct.Struct("<8sHI")
+_DTYPE = np.dtype("<i2")
+
+
+def save_season(season: Season, path: Path) -> None:
+    header = season.to_dict()
+    del header["schedule"]
+    header["num_rounds"] = len(season.schedule)
+    header_bytes = json.dumps(header).encode("utf-8")
+    # pad the header with whitespace, which is ignored by the JSON parser
+    header_bytes += b" " * (-(_PREFIX.size + len(header_bytes)) % ALIGNMENT)
+    matches = season.to_array_schedule().matches.astype(_DTYPE)
+    write_atomic(
+        path, _PREFIX.pack(MAGIC, VERSION, len(header_bytes)) + header_bytes + matches.tobytes()
+    )
+
+
+def load_header(path: Path) -> tuple[dict, int]:
+    """Get the header of a season file and the offset of its schedule."""
+    with open(path, "rb") as f:
+        magic, version, length = _PREFIX.unpack(f.read(_PREFIX.size))
+        if magic != MAGIC:
+            raise ValueError(f"{path} is not a season file.")
+        if version != VERSION:
+            raise ValueError(f"Unsupported season file version {version}.")
+        return json.loads(f.read(length)), _PREFIX.size + length
+
+
+def open_schedule(path: Path) -> np.memmap:
+    """Memory map the schedule of a season file read-only, without parsing it."""
+    header, offset = load_header(path)
+    shape = (header["num_rounds"], header["number_courts"], 2)
+    return np.memmap(path, dtype=_DTYPE, mode="r", offset=offset, shape=shape)
+
+
+def load_season(path: Path) -> Season:
+    """Load a season, its schedule is read from the file instead of being constructed."""
+    header, offset = load_header(path)
+    shape = (header["num_rounds"], header["number_courts"], 2)
+    matches = np.fromfile(path, dtype=_DTYPE, count=int(np.prod(shape)), offset=offset)
+    matches = matches.reshape(shape)
+    header["schedule"] = [
+        [(p, None if q == BYE else q) for p, q in round_ if p != BYE] for round_ in matches.tolist()
+    ]
+    return Season.from_dict(header)
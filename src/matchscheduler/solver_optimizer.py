@@ -0,0 +1,204 @@
+"""Mixed integer programming backend for small seasons with a certified lower bound.
+
+Needs the optional dependency ortools (pip install matchscheduler[solver]).
+"""
+
+import logging
+import math
+from collections import Counter
+from itertools import combinations
+
+from .match import Match, create_match, get_players_of_match
+from .optimizer import MAX_SECONDS, Optimizer
+from .scoring_algorithm import BoundScoringAlgorithm, get_std_of_pause_from_squares
+from .season import Season
+
+try:
+    from ortools.linear_solver import pywraplp
+except ImportError:
+    pywraplp = None
+
+# reasons why the solver stopped, besides the ones of the Optimizer
+OPTIMAL = "optimal"
+NO_SOLUTION = "no_solution"
+
+
+def get_min_std_of_pause(count: int, num_rounds: int) -> float:
+    """Get the lowest standard deviation of pauses possible when playing count rounds."""
+    if count <= 1:
+        return num_rounds
+    num_gaps = count + 1
+    pause, longer = divmod(num_rounds, num_gaps)
+    squares = longer * (pause + 1) ** 2 + (num_gaps - longer) * pause**2
+    return get_std_of_pause_from_squares(num_gaps, squares, num_rounds)
+
+
+class SolverOptimizer:
+    """Optimize a season with a mixed integer program solved by OR-Tools.
+
+    The program chooses the matches of every round which is not fixed. Its objective is a
+    linear lower bound of the score: the standard deviations of the counts are replaced
+    by the mean absolute deviations, which are never larger, and the standard deviations
+    of the pauses by the lowest possible value for the count of every player and pair.
+    The solver starts from the schedule of the season. Its solution is polished with
+    the greedy Optimizer and only kept if it beats the start schedule. lower_bound is
+    a certified bound of the best score possible and gap the relative distance to it.
+    """
+
+    def __init__(
+        self,
+        season: Season,
+        max_seconds: float = 30,
+        solver_name: str = "SCIP",
+        polish: bool = True,
+    ):
+        if pywraplp is None:
+            raise ImportError("SolverOptimizer needs ortools, install matchscheduler[solver].")
+        self.season = season
+        self.max_seconds = max_seconds
+        self.solver_name = solver_name
+        self.polish = polish
+        self.lower_bound = 0.0
+        self.gap = math.inf
+        self.stop_reason: str | None = None
+        self.logger = logging.getLogger(__name__)
+        self.scorer = BoundScoringAlgorithm(season.players)
+
+    def _add_std(self, solver, values: list, start_values: list[float]):
+        """Add a variable which is at most the standard deviation of values.
+
+        For every unit vector u with sum 0 the standard deviation of x is at least
+        u * x / sqrt(n) and at least the mean absolute deviation from any center. Cuts are
+        added for the direction of the start schedule and of every single value.
+        """
+        n = len(values)
+        std = solver.NumVar(0, solver.infinity(), "")
+        center = solver.NumVar(-solver.infinity(), solver.infinity(), "")
+        deviations = []
+        for value in values:
+            deviation = solver.NumVar(0, solver.infinity(), "")
+            solver.Add(deviation >= value - center)
+            solver.Add(deviation >= center - value)
+            deviations.append(deviation)
+        solver.Add(std >= solver.Sum(deviations) / n)
+
+        mean = sum(start_values) / n
+        directions = [[v - mean for v in start_values]]
+        for i in range(n):
+            direction = [-1 / n] * n
+            direction[i] += 1
+            directions += [direction, [-d for d in direction]]
+        for direction in directions:
+            norm = math.sqrt(sum(d * d for d in direction))
+            if norm > 0:
+                cut = solver.Sum([d / norm * v for d, v in zip(direction, values)])
+                solver.Add(std >= cut / math.sqrt(n))
+        return std
+
+    def _add_min_std_of_pause(self, solver, count, fixed: int, maximum: int):
+        # one indicator for every possible count selects the lowest std of the pauses
+        num_rounds = len(self.season.schedule)
+        indicators = {k: solver.BoolVar("") for k in range(fixed, maximum + 1)}
+        solver.Add(solver.Sum(indicators.values()) == 1)
+        solver.Add(solver.Sum([k * z for k, z in indicators.items()]) == count)
+        return solver.Sum([get_min_std_of_pause(k, num_rounds) * z for k, z in indicators.items()])
+
+    def _build(self, solver) -> dict:
+        num_rounds = len(self.season.schedule)
+        num_players = len(self.season.players)
+        pairs = list(combinations(range(num_players), 2))
+        player_terms: list[list] = [[] for _ in range(num_players)]
+        pair_terms: dict[Match, list] = {pair: [] for pair in pairs}
+        player_fixed = [0] * num_players
+        pair_fixed = dict.fromkeys(pairs, 0)
+
+        variables = {}
+        for round_index, round_ in enumerate(self.season.schedule):
+            if round_index in self.season.fixed_rounds:
+                for match in round_:
+                    for p in get_players_of_match(match):
+                        player_fixed[p] += 1
+                    if match[1] is not None:
+                        pair_fixed[match] += 1  # type: ignore
+                continue
+            available = self.season.available_players[round_index]
+            round_variables = {pair: solver.BoolVar("") for pair in combinations(available, 2)}
+            solver.Add(solver.Sum(round_variables.values()) == self.season.num_courts)
+            for p in available:
+                solver.Add(solver.Sum([v for pair, v in round_variables.items() if p in pair]) <= 1)
+            for pair, variable in round_variables.items():
+                variables[round_index, pair] = variable
+                pair_terms[pair].append(variable)
+                for p in pair:
+                    player_terms[p].append(variable)
+
+        players = self.season.players
+        player_counts = [player_fixed[p] + solver.Sum(player_terms[p]) for p in range(num_players)]
+        pair_counts = {pair: pair_fixed[pair] + solver.Sum(pair_terms[pair]) for pair in pairs}
+        start_pairs = Counter(m for r in self.season.schedule for m in r if m[1] is not None)
+        start_players = Counter(p for r in self.season.schedule for m in r for p in m)
+        pair_weights = [players[p].weight * players[q].weight for p, q in pairs]
+        objective = num_rounds * self._add_std(
+            solver,
+            [pair_counts[pair] / w for pair, w in zip(pairs, pair_weights)],
+            [start_pairs[pair] / w for pair, w in zip(pairs, pair_weights)],
+        ) + num_rounds * self._add_std(
+            solver,
+            [c / players[p].weight for p, c in enumerate(player_counts)],
+            [start_players[p] / players[p].weight for p in range(num_players)],
+        )
+        for pair, count in pair_counts.items():
+            objective += self._add_min_std_of_pause(
+                solver, count, pair_fixed[pair], pair_fixed[pair] + len(pair_terms[pair])
+            )
+        for p, count in enumerate(player_counts):
+            objective += self._add_min_std_of_pause(
+                solver, count, player_fixed[p], player_fixed[p] + len(player_terms[p])
+            )
+        solver.Minimize(objective)
+        return variables
+
+    def optimize_schedule(self) -> float:
+        """Optimize the schedule for this season."""
+        start_schedule = [list(r) for r in self.season.schedule]
+        start_score = self.scorer.get_score(self.season.schedule, self.season.players)
+        solver = pywraplp.Solver.CreateSolver(self.solver_name)  # type: ignore
+        if solver is None:
+            raise ValueError(f"Solver {self.solver_name} is not available.")
+        variables = self._build(solver)
+        start_matches = {
+            (i, m) for i, r in enumerate(self.season.schedule) for m in r if m[1] is not None
+        }
+        solver.SetHint(list(variables.values()), [float(key in start_matches) for key in variables])
+        solver.SetTimeLimit(int(self.max_seconds * 1000))
+        status = solver.Solve()
+
+        if status in (pywraplp.Solver.OPTIMAL, pywraplp.Solver.FEASIBLE):  # type: ignore
+            self.stop_reason = OPTIMAL if status == pywraplp.Solver.OPTIMAL else MAX_SECONDS  # type: ignore
+            self.lower_bound = max(solver.Objective().BestBound(), 0.0)
+            schedule = [
+                list(r) if i in self.season.fixed_rounds else []
+                for i, r in enumerate(start_schedule)
+            ]
+            for (round_index, pair), variable in variables.items():
+                if variable.solution_value() > 0.5:
+                    schedule[round_index].append(create_match(*pair))
+            self.season.schedule = schedule
+            if self.polish:
+                Optimizer(self.season).optimize_schedule()
+        else:
+            self.stop_reason = NO_SOLUTION
+
+        score = self.scorer.get_score(self.season.schedule, self.season.players)
+        if score > start_score:
+            self.season.schedule = start_schedule
+            score = start_score
+        self.gap = (score - self.lower_bound) / score if score > 0 else 0.0
+        self.logger.info(
+            "Solver finished (%s) with score %.3f, lower bound %.3f and gap %.1f%%",
+            self.stop_reason,
+            score,
+            self.lower_bound,
+            100 * self.gap,
+        )
+        return score
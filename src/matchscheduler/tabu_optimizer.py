@@ -0,0 +1,197 @@
+"""Tabu search optimizer using the mutation methods of Season."""
+
+import logging
+import random
+from collections import Counter, deque
+from itertools import combinations
+from typing import Callable
+
+from .incremental_scorer import IncrementalScorer, Move, Placement
+from .instrumentation import profile
+from .match import get_players_of_match
+from .optimizer import Optimizer
+from .scoring_algorithm import BoundScoringAlgorithm
+from .season import Season
+
+# a candidate is the change of the score, the move and how to apply it to the season
+Candidate = tuple[float, Move, Callable[[], bool]]
+
+
+class TabuList:
+    """Recently removed placements with O(1) membership checks.
+
+    Putting a removed match back into its slot is tabu for the next `tenure` moves.
+    """
+
+    def __init__(self, tenure: int):
+        self.tenure = tenure
+        self.placements: deque[Placement] = deque()
+        self.counts: Counter[Placement] = Counter()
+
+    def add(self, placement: Placement) -> None:
+        self.placements.append(placement)
+        self.counts[placement] += 1
+        if len(self.placements) > self.tenure:
+            oldest = self.placements.popleft()
+            self.counts[oldest] -= 1
+            if self.counts[oldest] == 0:
+                del self.counts[oldest]
+
+    def is_tabu(self, move: Move) -> bool:
+        return any(placement in self.counts for placement in move)
+
+
+class TabuOptimizer:
+    """Optimize a season by tabu search.
+
+    The search starts from the plateau of the greedy Optimizer. Every iteration evaluates
+    all replacements of matches and all swaps of players inside a round for every round and
+    switches of matches of num_switch_rounds random rounds with num_partner_rounds random
+    other rounds each. The best move which is not tabu is applied, even if it worsens the
+    score. Tabu moves are still allowed if they lead to a new best score (aspiration). The
+    run ends after max_iterations or stall_limit iterations without a new best score and
+    leaves the best schedule seen in the season.
+    """
+
+    def __init__(
+        self,
+        season: Season,
+        max_iterations: int = 500,
+        stall_limit: int = 100,
+        tenure: int = 7,
+        num_switch_rounds: int = 10,
+        num_partner_rounds: int = 5,
+        rng: random.Random | None = None,
+    ):
+        self.season = season
+        self.max_iterations = max_iterations
+        self.stall_limit = stall_limit
+        self.tabu_list = TabuList(tenure)
+        self.num_switch_rounds = num_switch_rounds
+        self.num_partner_rounds = num_partner_rounds
+        self.rng = rng or random.Random()
+        self.logger = logging.getLogger(__name__)
+        self.scorer = BoundScoringAlgorithm(season.players)
+
+    def _get_replacements(self, round_index: int, scorer: IncrementalScorer) -> list[Candidate]:
+        candidates: list[Candidate] = []
+        for match_index in range(len(self.season.schedule[round_index])):
+            matches = self.season.get_candidate_matches(round_index, match_index)
+            deltas = scorer.get_slot_deltas(round_index, match_index, matches)
+            for match, delta in zip(matches, deltas):
+                candidates.append(
+                    (
+                        float(delta),
+                        ((round_index, match_index, match),),
+                        lambda m=match_index, x=match: self.season.change_match(round_index, m, x),
+                    )
+                )
+        return candidates
+
+    def _get_swaps(self, round_index: int, scorer: IncrementalScorer) -> list[Candidate]:
+        candidates: list[Candidate] = []
+        round_ = self.season.schedule[round_index]
+        for match1, match2 in combinations(range(len(round_)), 2):
+            for p in get_players_of_match(round_[match1]):
+                for q in get_players_of_match(round_[match2]):
+                    self.season.swap_players_of_existing_matches(round_index, p, q)
+                    move = scorer.get_move_to(self.season.schedule, [round_index])
+                    self.season.swap_players_of_existing_matches(round_index, p, q)
+                    candidates.append(
+                        (
+                            scorer.score_delta(move),
+                            move,
+                            lambda p=p, q=q: self.season.swap_players_of_existing_matches(
+                                round_index, p, q
+                            ),
+                        )
+                    )
+        return candidates
+
+    def _get_switches(
+        self, round_index: int, rounds: list[int], scorer: IncrementalScorer
+    ) -> list[Candidate]:
+        candidates: list[Candidate] = []
+        others = [r for r in rounds if r != round_index]
+        for other in self.rng.sample(others, min(self.num_partner_rounds, len(others))):
+            for match1 in range(len(self.season.schedule[round_index])):
+                for match2 in range(len(self.season.schedule[other])):
+                    if self.season.schedule[round_index][match1] == self.season.schedule[other][
+                        match2
+                    ] or not self.season.switch_matches(round_index, match1, other, match2):
+                        continue
+                    move = (
+                        (round_index, match1, self.season.schedule[round_index][match1]),
+                        (other, match2, self.season.schedule[other][match2]),
+                    )
+                    self.season.switch_matches(round_index, match1, other, match2)
+                    candidates.append(
+                        (
+                            scorer.score_delta(move),
+                            move,
+                            lambda m1=match1, o=other, m2=match2: self.season.switch_matches(
+                                round_index, m1, o, m2
+                            ),
+                        )
+                    )
+        return candidates
+
+    def _apply(
+        self, move: Move, apply_to_season: Callable[[], bool], scorer: IncrementalScorer
+    ) -> None:
+        for round_index, match_index, _ in move:
+            self.tabu_list.add(
+                (round_index, match_index, scorer.schedule[round_index][match_index])
+            )
+        apply_to_season()
+        scorer.apply(move)
+
+    @profile
+    def optimize_schedule(self) -> float:
+        """Optimize the schedule for this season."""
+        rounds = [i for i in range(len(self.season.schedule)) if i not in self.season.fixed_rounds]
+        if not rounds:
+            return self.scorer.get_score(self.season.schedule, self.season.players)
+        Optimizer(self.season).optimize_schedule()
+        scorer = IncrementalScorer(self.season.schedule, self.season.players)
+        best_score = scorer.score
+        best_schedule = [list(r) for r in self.season.schedule]
+
+        stalled = 0
+        for iteration in range(self.max_iterations):
+            if stalled >= self.stall_limit:
+                break
+            candidates = []
+            for round_index in rounds:
+                candidates += self._get_replacements(round_index, scorer)
+                candidates += self._get_swaps(round_index, scorer)
+            for round_index in self.rng.sample(rounds, min(len(rounds), self.num_switch_rounds)):
+                candidates += self._get_switches(round_index, rounds, scorer)
+            admissible = [
+                c
+                for c in candidates
+                if c[1] and (not self.tabu_list.is_tabu(c[1]) or scorer.score + c[0] < best_score)
+            ]
+            if not admissible:
+                stalled += 1
+                continue
+            _, move, apply_to_season = min(admissible, key=lambda c: c[0])
+            self._apply(move, apply_to_season, scorer)
+
+            if scorer.score < best_score:
+                self.logger.debug(
+                    "Iteration %i - new best score = %.2f - old best score = %.2f",
+                    iteration,
+                    scorer.score,
+                    best_score,
+                )
+                best_score = scorer.score
+                best_schedule = [list(r) for r in self.season.schedule]
+                stalled = 0
+            else:
+                stalled += 1
+
+        self.season.schedule = best_schedule
+        score = self.scorer.get_score(self.season.schedule, self.season.players)
+        self.logger.info("Tabu search finished with score %.3f", score)
+        return score
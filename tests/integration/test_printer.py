@@ -1,7 +1,9 @@
 import json
 from pathlib import Path
 
-from matchscheduler.printer import Printer
+from openpyxl import load_workbook
+
+from matchscheduler.printer import MANIFEST_NAME, Printer
 from matchscheduler.season import Season
 
 
@@ -12,3 +14,57 @@ def test_printer(request, tmp_path):
         s = Season.from_dict(json.load(input))
         p = Printer(s)
         p.export(tmp_path)
+
+
+def test_export_excel_writes_all_sheets(request, tmp_path):
+    base_path = Path(request.path).parent
+    with open(f"{base_path}/input/test_printer.json", "r", encoding="utf-8") as input:
+        s = Season.from_dict(json.load(input))
+    Printer(s).export_excel(tmp_path)
+
+    workbook = load_workbook(tmp_path / "schedule.xlsx", read_only=True)
+    assert workbook.sheetnames == ["Schedule", "Partner by Player", "Matches Overview", "Costs"]
+    matches = list(workbook["Costs"].iter_rows(values_only=True))[1][1:]
+    assert sum(matches) == sum(len(r) * 2 for r in s.schedule)
+    overview = list(workbook["Matches Overview"].iter_rows(values_only=True))
+    assert [row.count("x") for row in overview[1:]] == [len(r) for r in s.schedule]
+
+
+def test_export_calendar_fast_writes_the_same_files(request, tmp_path):
+    base_path = Path(request.path).parent
+    with open(f"{base_path}/input/test_printer.json", "r", encoding="utf-8") as input:
+        s = Season.from_dict(json.load(input))
+    # needs escaping, folding and more than one octet per character
+    s.players[0].name = "Müller, Jane; with a name long enough to fold the description line"
+    s.calendar_title = "Tennis, Abo"
+    (tmp_path / "objects").mkdir()
+    (tmp_path / "templates").mkdir()
+
+    Printer(s).export_calendar(tmp_path / "objects")
+    Printer(s).export_calendar(tmp_path / "templates", fast=True, max_workers=2)
+
+    for p in s.players:
+        expected = (tmp_path / "objects" / f"{p.name}.ics").read_bytes()
+        assert (tmp_path / "templates" / f"{p.name}.ics").read_bytes() == expected
+
+
+def test_incremental_export_only_rewrites_changed_files(request, tmp_path):
+    base_path = Path(request.path).parent
+    with open(f"{base_path}/input/test_printer.json", "r", encoding="utf-8") as input:
+        s = Season.from_dict(json.load(input))
+    Printer(s).export(tmp_path, incremental=True)
+    inodes = {p.name: p.stat().st_ino for p in tmp_path.iterdir()}
+
+    Printer(s).export(tmp_path, incremental=True)
+    assert {p.name: p.stat().st_ino for p in tmp_path.iterdir() if p.name != MANIFEST_NAME} == {
+        name: inode for name, inode in inodes.items() if name != MANIFEST_NAME
+    }
+
+    round_index = next(i for i in range(len(s.schedule)) if s.get_candidate_matches(i, 0))
+    old_match = s.schedule[round_index][0]
+    new_match = s.get_candidate_matches(round_index, 0)[0]
+    assert s.change_match(round_index, 0, new_match)
+    Printer(s).export(tmp_path, incremental=True)
+    changed = {p.name for p in tmp_path.iterdir() if p.stat().st_ino != inodes.get(p.name)}
+    players = {s.players[p].name for p in set(old_match + new_match) if p is not None}
+    assert changed == {"schedule.xlsx", MANIFEST_NAME} | {f"{name}.ics" for name in players}
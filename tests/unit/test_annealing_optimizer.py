@@ -0,0 +1,61 @@
+import random
+from datetime import date, time
+
+import pytest
+
+from matchscheduler.annealing_optimizer import (AnnealingOptimizer, geometric_cooling,
+                                                linear_cooling)
+from matchscheduler.player import Player
+from matchscheduler.scoring_algorithm import ScoringAlgorithm
+from matchscheduler.season import Season
+
+
+@pytest.fixture()
+def season_instance():
+    random.seed(0)
+    player_list = [
+        Player("Max", ["2024-01-01", "2024-01-08"], 1),
+        Player("Peter", ["2024-01-08"], 1),
+        Player("Ida", [], 2),
+        Player("Franz", [], 1),
+        Player("Helmut", [], 1),
+        Player("Jens", [], 1),
+    ]
+    return Season(player_list, date(2024, 1, 1), date(2024, 4, 29), 2, time(19), time(21), [], 100)
+
+
+@pytest.mark.parametrize("cooling", [geometric_cooling(10, 0.01), linear_cooling(10, 0.01)])
+def test_cooling_goes_from_start_to_end_temperature(cooling):
+    assert cooling(0) == pytest.approx(10)
+    assert cooling(1) == pytest.approx(0.01)
+    assert cooling(0) > cooling(0.5) > cooling(1)
+
+
+def test_init_requires_a_budget(season_instance):
+    with pytest.raises(ValueError):
+        AnnealingOptimizer(season_instance)
+
+
+def test_optimize_schedule_improves_and_keeps_schedule_valid(season_instance):
+    scorer = ScoringAlgorithm()
+    initial_score = scorer.get_score(season_instance.schedule, season_instance.players)
+    uut = AnnealingOptimizer(
+        season_instance, max_iterations=2000, rng=random.Random(1), trace_interval=100
+    )
+    score = uut.optimize_schedule()
+
+    assert score < initial_score
+    assert score == scorer.get_score(season_instance.schedule, season_instance.players)
+    assert season_instance.check_schedule_is_valid()
+    assert len(uut.trace) == 21
+    assert uut.trace[-1][2] == pytest.approx(score)
+    assert all(a[2] >= b[2] for a, b in zip(uut.trace, uut.trace[1:]))
+
+
+def test_optimize_schedule_is_reproducible(season_instance):
+    schedule = [list(r) for r in season_instance.schedule]
+    first = AnnealingOptimizer(season_instance, max_iterations=500, rng=random.Random(3))
+    first_score = first.optimize_schedule()
+    season_instance.schedule = schedule
+    second = AnnealingOptimizer(season_instance, max_iterations=500, rng=random.Random(3))
+    assert second.optimize_schedule() == first_score
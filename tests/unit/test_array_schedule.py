@@ -0,0 +1,44 @@
+import numpy as np
+import pytest
+
+from matchscheduler.array_schedule import BYE, ArraySchedule
+from matchscheduler.match import create_match
+
+
+@pytest.fixture()
+def schedule():
+    return [
+        [create_match(0, 1), create_match(2, 3)],
+        [create_match(0, 2), create_match(1, None)],
+        [create_match(3, 1)],
+    ]
+
+
+def test_from_schedule_pads_partial_rounds(schedule):
+    uut = ArraySchedule.from_schedule(schedule, 4, 2)
+    assert uut.matches.shape == (3, 2, 2)
+    assert uut.matches.dtype == np.int16
+    assert uut.matches[1, 1].tolist() == [1, BYE]
+    assert uut.matches[2, 1].tolist() == [BYE, BYE]
+
+
+def test_to_schedule_is_inverse_of_from_schedule(schedule):
+    assert ArraySchedule.from_schedule(schedule, 4, 2).to_schedule() == schedule
+
+
+def test_incidence_counts_players_per_round(schedule):
+    uut = ArraySchedule.from_schedule(schedule, 5, 2)
+    assert uut.incidence.tolist() == [
+        [1, 1, 0],
+        [1, 1, 1],
+        [1, 1, 0],
+        [1, 0, 1],
+        [0, 0, 0],
+    ]
+
+
+def test_get_pair_occurrences_ignores_byes(schedule):
+    rounds, pairs = ArraySchedule.from_schedule(schedule, 4, 2).get_pair_occurrences()
+    # pair indizes of (0, 1), (2, 3), (0, 2), (1, 3) for four players
+    assert rounds.tolist() == [0, 0, 1, 2]
+    assert pairs.tolist() == [0, 5, 1, 4]
@@ -0,0 +1,118 @@
+import json
+import random
+
+import pytest
+
+from matchscheduler import optimizer
+from matchscheduler.checkpoint import (
+    atomic_path,
+    get_random_state,
+    read_checkpoint,
+    set_random_state,
+    write_checkpoint,
+)
+from matchscheduler.optimizer import Optimizer
+from matchscheduler.season import Season
+
+SETTINGS = {
+    "calendar": {"title": "Tennisabo", "time_start": "19:00", "time_end": "21:00"},
+    "abo": {
+        "start": "2024-01-01",
+        "end": "2024-04-29",
+        "excluded_dates": [],
+        "overall_cost": 1000,
+        "number_courts": 2,
+    },
+    "players": [
+        {"name": "Max", "cannot_play": ["2024-01-01"], "weight": 1},
+        {"name": "Peter", "cannot_play": [], "weight": 1},
+        {"name": "Ida", "cannot_play": [], "weight": 2},
+        {"name": "Franz", "cannot_play": ["2024-02-05"], "weight": 1},
+        {"name": "Helmut", "cannot_play": [], "weight": 1},
+        {"name": "Jens", "cannot_play": [], "weight": 1},
+    ],
+}
+
+
+def test_write_checkpoint_replaces_file_atomically(tmp_path):
+    path = tmp_path / "checkpoint.json"
+    write_checkpoint(path, {"a": 1})
+    write_checkpoint(path, {"a": 2})
+
+    assert read_checkpoint(path) == {"a": 2}
+    assert [p.name for p in tmp_path.iterdir()] == ["checkpoint.json"]
+
+
+def test_write_checkpoint_keeps_old_checkpoint_on_error(tmp_path):
+    path = tmp_path / "checkpoint.json"
+    write_checkpoint(path, {"a": 1})
+    with pytest.raises(TypeError):
+        write_checkpoint(path, {"a": object()})
+
+    assert read_checkpoint(path) == {"a": 1}
+    assert [p.name for p in tmp_path.iterdir()] == ["checkpoint.json"]
+
+
+def test_atomic_path_keeps_old_file_on_error(tmp_path):
+    path = tmp_path / "schedule.xlsx"
+    path.write_bytes(b"old")
+    with pytest.raises(RuntimeError):
+        with atomic_path(path) as tmp:
+            tmp.write_bytes(b"partial")
+            raise RuntimeError()
+
+    assert path.read_bytes() == b"old"
+    assert [p.name for p in tmp_path.iterdir()] == ["schedule.xlsx"]
+
+
+def test_random_state_round_trip():
+    random.seed(3)
+    state = json.loads(json.dumps(get_random_state()))
+    expected = random.random()
+    set_random_state(state)
+
+    assert random.random() == expected
+
+
+@pytest.mark.parametrize("checkpoint_pass", [optimizer.PLAYERS_SWAP, optimizer.MATCH_SWAP])
+def test_resumed_run_ends_like_uninterrupted_run(tmp_path, monkeypatch, checkpoint_pass):
+    checkpoints = []
+
+    def record(path, data):
+        checkpoints.append(json.loads(json.dumps(data)))
+
+    monkeypatch.setattr(optimizer, "write_checkpoint", record)
+    random.seed(0)
+    season = Season.create_from_settings(SETTINGS)
+    expected_score = Optimizer(
+        season, checkpoint_path=tmp_path / "x", checkpoint_interval=0
+    ).optimize_schedule()
+    monkeypatch.undo()
+
+    # resume from a checkpoint in the middle of a pass of the first iteration
+    checkpoint = [c for c in checkpoints if c["position"]["pass"] == checkpoint_pass][5]
+    path = tmp_path / "checkpoint.json"
+    write_checkpoint(path, checkpoint)
+    uut = Optimizer.from_checkpoint(path)
+    score = uut.optimize_schedule()
+
+    assert uut.season.schedule == season.schedule
+    assert score == expected_score
+    assert read_checkpoint(path)["stop_reason"] == optimizer.CONVERGED
+
+
+def test_final_checkpoint_of_bounded_run_can_be_resumed(tmp_path):
+    path = tmp_path / "checkpoint.json"
+    random.seed(0)
+    season = Season.create_from_settings(SETTINGS)
+    Optimizer(season, checkpoint_path=path).optimize_schedule(max_iterations=1)
+
+    checkpoint = read_checkpoint(path)
+    assert checkpoint["stop_reason"] == optimizer.MAX_ITERATIONS
+    assert checkpoint["iteration"] == 1
+    assert checkpoint["position"] == {"pass": optimizer.PLAYERS_SWAP, "index": 0, "swaps": 0}
+
+    uut = Optimizer.from_checkpoint(path)
+    uut.optimize_schedule()
+    assert uut.stop_reason == optimizer.CONVERGED
+    assert uut.season.check_schedule_is_valid()
@@ -0,0 +1,81 @@
+import json
+import random
+from itertools import combinations
+
+import pytest
+
+from matchscheduler.incremental_scorer import IncrementalScorer, get_pair_index
+from matchscheduler.match import create_match
+from matchscheduler.scoring_algorithm import ScoringAlgorithm
+from matchscheduler.season import Season
+
+
+@pytest.fixture()
+def season_instance():
+    return Season.from_dict(
+        json.loads(
+            '{"players": [{"name": "Max", "cannot_play": ["2024-01-01", "2024-01-08"], "weight": 1}, {"name": "Peter", "cannot_play": ["2024-01-08"], "weight": 1}, {"name": "Ida", "cannot_play": [], "weight": 2}, {"name": "Franz", "cannot_play": [], "weight": 1}, {"name": "Helmut", "cannot_play": [], "weight": 1}, {"name": "Jens", "cannot_play": [], "weight": 1}], "start": "2024-01-01", "end": "2024-04-29", "number_courts": 2, "time_start": "19:00:00", "time_end": "21:00:00", "excluded_dates": [], "overall_cost": 2000, "calendar_title": "Tennisabo", "schedule": [[[2, 3], [1, 5]], [[3, 4], [2, 5]], [[1, 2], [0, 5]], [[1, 2], [4, 5]], [[3, 5], [1, 2]], [[1, 2], [0, 5]], [[1, 3], [4, 5]], [[1, 3], [2, 4]], [[0, 4], [1, 2]], [[3, 5], [0, 4]], [[2, 3], [0, 4]], [[1, 5], [3, 4]], [[0, 5], [1, 4]], [[0, 5], [1, 2]], [[2, 4], [0, 3]], [[1, 4], [0, 3]], [[1, 5], [0, 3]], [[1, 2], [3, 5]]]}'  # noqa: E501
+        )
+    )
+
+
+def test_get_pair_index_follows_combinations_order():
+    expected = list(combinations(range(5), 2))
+    assert [get_pair_index(p, q, 5) for p, q in expected] == list(range(len(expected)))
+
+
+def test_init_score_equals_get_score(season_instance):
+    uut = IncrementalScorer(season_instance.schedule, season_instance.players)
+    assert uut.score == ScoringAlgorithm().get_score(
+        season_instance.schedule, season_instance.players
+    )
+
+
+def test_score_delta_doesnt_change_state(season_instance):
+    uut = IncrementalScorer(season_instance.schedule, season_instance.players)
+    score = uut.score
+    uut.score_delta(((3, 1, create_match(3, 4)),))
+    assert uut.score == score
+    assert uut.schedule == season_instance.schedule
+    assert uut.score == IncrementalScorer(uut.schedule, season_instance.players).score
+
+
+def test_score_delta_and_apply_match_get_score(season_instance):
+    random.seed(1)
+    uut = IncrementalScorer(season_instance.schedule, season_instance.players)
+    scorer = ScoringAlgorithm()
+    players = range(len(season_instance.players))
+    for _ in range(200):
+        round_index = random.randrange(len(season_instance.schedule))
+        if random.random() < 0.5:
+            match_index = random.randrange(season_instance.num_courts)
+            if not season_instance.change_match(
+                round_index, match_index, create_match(*random.sample(players, 2))
+            ):
+                continue
+            move = uut.get_move_to(season_instance.schedule, [round_index])
+        else:
+            round_index2 = random.randrange(len(season_instance.schedule))
+            if not season_instance.switch_matches(round_index, 0, round_index2, 1):
+                continue
+            move = uut.get_move_to(season_instance.schedule, [round_index, round_index2])
+        expected = scorer.get_score(season_instance.schedule, season_instance.players)
+        assert uut.score + uut.score_delta(move) == pytest.approx(expected, abs=1e-9)
+        assert uut.apply(move) == expected
+        assert uut.schedule == season_instance.schedule
+
+
+@pytest.mark.parametrize("round_index, match_index", [(3, 1), (0, 0), (17, 1)])
+def test_get_slot_deltas_match_get_score(season_instance, round_index, match_index):
+    uut = IncrementalScorer(season_instance.schedule, season_instance.players)
+    scorer = ScoringAlgorithm()
+    candidates = season_instance.get_candidate_matches(round_index, match_index)
+    deltas = uut.get_slot_deltas(round_index, match_index, candidates)
+
+    assert len(deltas) == len(candidates)
+    assert uut.schedule == season_instance.schedule
+    for candidate, delta in zip(candidates, deltas):
+        schedule = [list(r) for r in season_instance.schedule]
+        schedule[round_index][match_index] = candidate
+        expected = scorer.get_score(schedule, season_instance.players) - uut.score
+        assert delta == pytest.approx(expected, abs=1e-9)
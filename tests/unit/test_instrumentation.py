@@ -0,0 +1,40 @@
+import importlib
+
+import pytest
+
+from matchscheduler import instrumentation
+
+
+@pytest.fixture()
+def unset_profile_mode(monkeypatch):
+    monkeypatch.delenv("MATCHSCHEDULER_PROFILE", raising=False)
+    importlib.reload(instrumentation)
+    yield
+    # reload with the environment the tests run in
+    monkeypatch.undo()
+    importlib.reload(instrumentation)
+
+
+@pytest.mark.usefixtures("unset_profile_mode")
+def test_profile_is_a_no_op_by_default():
+    def func():
+        pass
+
+    assert instrumentation.MODE == ""
+    assert instrumentation.profile(func) is func
+
+
+def test_timer_profile_counts_calls():
+    @instrumentation._timer_profile
+    def add(a, b):
+        return a + b
+
+    assert add(1, 2) == 3
+    add(3, 4)
+
+    calls, seconds = instrumentation.get_timings()[f"{__name__}.{add.__qualname__}"]
+    assert calls == 2
+    assert seconds >= 0
+
+    instrumentation.reset_timings()
+    assert f"{__name__}.{add.__qualname__}" not in instrumentation.get_timings()
@@ -0,0 +1,45 @@
+import pytest
+
+from matchscheduler.island_runner import IslandRunner
+from matchscheduler.scoring_algorithm import ScoringAlgorithm
+
+
+@pytest.fixture()
+def settings():
+    return {
+        "calendar": {"title": "Tennisabo", "time_start": "19:00", "time_end": "21:00"},
+        "abo": {
+            "start": "2024-01-01",
+            "end": "2024-03-25",
+            "excluded_dates": [],
+            "overall_cost": 1000,
+            "number_courts": 1,
+        },
+        "players": [
+            {"name": "Max", "cannot_play": ["2024-01-01"], "weight": 1},
+            {"name": "Peter", "cannot_play": [], "weight": 1},
+            {"name": "Ida", "cannot_play": [], "weight": 1},
+            {"name": "Franz", "cannot_play": [], "weight": 1},
+            {"name": "Anna", "cannot_play": ["2024-02-05"], "weight": 1},
+        ],
+    }
+
+
+def test_run_returns_valid_season(settings):
+    uut = IslandRunner(settings, seeds=[1, 2, 3], epochs=3, migration_interval=200, max_workers=2)
+    score, season = uut.run()
+
+    assert season.check_schedule_is_valid()
+    assert score == pytest.approx(ScoringAlgorithm().get_score(season.schedule, season.players))
+    assert len(uut.history) == 3
+    assert score == min(uut.history[-1])
+
+
+def test_run_is_reproducible(settings):
+    score1, season1 = IslandRunner(settings, [4, 5], epochs=2, migration_interval=200).run()
+    score2, season2 = IslandRunner(
+        settings, [4, 5], epochs=2, migration_interval=200, max_workers=1
+    ).run()
+
+    assert score1 == score2
+    assert season1.schedule == season2.schedule
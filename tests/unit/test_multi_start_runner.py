@@ -0,0 +1,63 @@
+import time
+
+import pytest
+
+from matchscheduler.multi_start_runner import MultiStartRunner
+from matchscheduler.scoring_algorithm import ScoringAlgorithm
+
+
+@pytest.fixture()
+def settings():
+    return {
+        "calendar": {"title": "Tennisabo", "time_start": "19:00", "time_end": "21:00"},
+        "abo": {
+            "start": "2024-01-01",
+            "end": "2024-03-25",
+            "excluded_dates": [],
+            "overall_cost": 1000,
+            "number_courts": 1,
+        },
+        "players": [
+            {"name": "Max", "cannot_play": ["2024-01-01"], "weight": 1},
+            {"name": "Peter", "cannot_play": [], "weight": 1},
+            {"name": "Ida", "cannot_play": [], "weight": 1},
+            {"name": "Franz", "cannot_play": [], "weight": 1},
+        ],
+    }
+
+
+def test_run_returns_best_season_of_all_seeds(settings):
+    uut = MultiStartRunner(settings, seeds=[1, 2, 3], max_workers=2)
+    score, season = uut.run()
+
+    assert season.check_schedule_is_valid()
+    assert score == ScoringAlgorithm().get_score(season.schedule, season.players)
+    assert sorted(seed for seed, _ in uut.results) == [1, 2, 3]
+    assert score == min(s for _, s in uut.results)
+    assert uut.archive is not None
+    assert uut.archive.entries[0].score == score
+
+
+def test_run_stops_when_target_score_is_reached(settings):
+    uut = MultiStartRunner(settings, seeds=list(range(20)), max_workers=1, target_score=1e9)
+    score, season = uut.run()
+
+    assert len(uut.results) < 20
+    assert season.check_schedule_is_valid()
+    assert score <= 1e9
+
+
+def test_run_returns_when_time_budget_is_used_up(settings):
+    settings["abo"]["end"] = "2024-12-23"
+    settings["abo"]["number_courts"] = 4
+    settings["players"] = [
+        {"name": f"Player {i}", "cannot_play": [], "weight": 1} for i in range(40)
+    ]
+    uut = MultiStartRunner(settings, seeds=[1, 2], max_workers=2, max_seconds=1)
+
+    start = time.monotonic()
+    _, season = uut.run()
+
+    # workers stop at the deadline instead of finishing their iteration
+    assert time.monotonic() - start < 3
+    assert season.check_schedule_is_valid()
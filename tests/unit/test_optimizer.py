@@ -0,0 +1,170 @@
+import random
+
+import pytest
+
+from matchscheduler import optimizer
+from matchscheduler.optimizer import Optimizer
+from matchscheduler.schedule_diff import diff
+from matchscheduler.score_cache import ScoreCache
+from matchscheduler.scoring_algorithm import ScoringAlgorithm
+from matchscheduler.season import Season
+
+
+@pytest.fixture()
+def season_instance():
+    random.seed(0)
+    return Season.create_from_settings(
+        {
+            "calendar": {"title": "Tennisabo", "time_start": "19:00", "time_end": "21:00"},
+            "abo": {
+                "start": "2024-01-01",
+                "end": "2024-06-24",
+                "excluded_dates": [],
+                "overall_cost": 1000,
+                "number_courts": 2,
+            },
+            "players": [
+                {"name": "Max", "cannot_play": ["2024-01-01"], "weight": 1},
+                {"name": "Peter", "cannot_play": [], "weight": 1},
+                {"name": "Ida", "cannot_play": [], "weight": 2},
+                {"name": "Franz", "cannot_play": ["2024-02-05"], "weight": 1},
+                {"name": "Helmut", "cannot_play": [], "weight": 1},
+                {"name": "Jens", "cannot_play": [], "weight": 1},
+                {"name": "Anna", "cannot_play": [], "weight": 1},
+            ],
+        }
+    )
+
+
+def get_score(season):
+    return ScoringAlgorithm().get_score(season.schedule, season.players)
+
+
+def test_optimize_schedule_converges_without_bounds(season_instance):
+    uut = Optimizer(season_instance)
+    score = uut.optimize_schedule()
+
+    assert uut.stop_reason == optimizer.CONVERGED
+    assert score == get_score(season_instance)
+
+
+def test_optimize_schedule_stops_after_max_iterations(season_instance):
+    uut = Optimizer(season_instance)
+    uut.optimize_schedule(max_iterations=1)
+
+    assert uut.stop_reason == optimizer.MAX_ITERATIONS
+    assert len(uut.stats.iterations) == 1
+
+
+def test_optimize_schedule_stops_inside_passes_at_target_score(season_instance):
+    initial_score = get_score(season_instance)
+    uut = Optimizer(season_instance)
+    score = uut.optimize_schedule(target_score=initial_score - 1e-9)
+
+    assert uut.stop_reason == optimizer.TARGET_SCORE
+    assert score < initial_score
+    # the first improving move already reaches the target
+    assert sum(p.accepted for p in uut.stats.iterations[0].passes.values()) == 1
+    assert season_instance.check_schedule_is_valid()
+
+
+def test_optimize_schedule_stops_at_stall_limit(season_instance):
+    uut = Optimizer(season_instance)
+    uut.optimize_schedule(stall_limit=1)
+
+    assert uut.stop_reason == optimizer.STALL_LIMIT
+    assert season_instance.check_schedule_is_valid()
+
+
+def test_optimize_schedule_stops_after_max_seconds(season_instance):
+    initial_score = get_score(season_instance)
+    uut = Optimizer(season_instance)
+    score = uut.optimize_schedule(max_seconds=0)
+
+    assert uut.stop_reason == optimizer.MAX_SECONDS
+    assert score == initial_score
+
+
+def test_optimize_schedule_stops_by_callback(season_instance):
+    uut = Optimizer(season_instance)
+    uut.optimize_schedule(callback=lambda iteration, score: True)
+
+    assert uut.stop_reason == optimizer.CALLBACK
+
+
+def test_optimize_schedule_stops_before_the_next_move_if_cancelled(season_instance):
+    schedule = [list(r) for r in season_instance.schedule]
+    uut = Optimizer(season_instance)
+    score = uut.optimize_schedule(should_stop=lambda: True)
+
+    assert uut.stop_reason == optimizer.CANCELLED
+    assert season_instance.schedule == schedule
+    assert score == uut.scorer.get_score(schedule)
+
+
+def test_repair_changes_only_rounds_near_the_invalid_round(season_instance):
+    Optimizer(season_instance).optimize_schedule()
+    published = [list(r) for r in season_instance.schedule]
+    player = published[10][0][0]
+    invalid_rounds = season_instance.apply_availability_change(
+        player, [season_instance.dates[10]], played_until=season_instance.dates[10]
+    )
+
+    uut = Optimizer(season_instance)
+    uut.repair(invalid_rounds, radius=1)
+
+    assert invalid_rounds == [10]
+    assert season_instance.check_schedule_is_valid()
+    assert all(player not in m for m in season_instance.schedule[10])
+    for i, round_ in enumerate(published):
+        if not 9 <= i <= 11:
+            assert season_instance.schedule[i] == round_
+
+
+def test_repair_keeps_dates_of_players_outside_the_repaired_match(season_instance):
+    Optimizer(season_instance).optimize_schedule()
+    published = Season.from_dict(season_instance.to_dict())
+    player = published.schedule[2][0][0]
+    invalid_rounds = season_instance.apply_availability_change(player, [season_instance.dates[2]])
+
+    Optimizer(season_instance).repair(invalid_rounds)
+
+    changes = diff(published, season_instance)
+    changed_dates = {d for c in changes.values() for d in c.added_dates + c.removed_dates}
+    assert changed_dates == {season_instance.dates[2]}
+    assert len([c for c in changes.values() if c.added_dates]) <= 2
+
+
+def test_repair_skips_partial_rounds_near_the_invalid_round(season_instance):
+    # only Max and Peter are left on 2024-03-11, so the round has less matches than courts
+    for player in range(2, 7):
+        season_instance.apply_availability_change(player, [season_instance.dates[10]])
+    partial_round = list(season_instance.schedule[10])
+    player = season_instance.schedule[11][0][0]
+    invalid_rounds = season_instance.apply_availability_change(player, [season_instance.dates[11]])
+
+    Optimizer(season_instance).repair(invalid_rounds)
+
+    assert len(partial_round) < season_instance.num_courts
+    assert season_instance.schedule[10] == partial_round
+    assert season_instance.check_if_round_is_valid(11)
+
+
+def test_deviation_penalty_keeps_the_reference_schedule(season_instance):
+    reference = [list(r) for r in season_instance.schedule]
+    uut = Optimizer(season_instance, reference=reference, deviation_weight=1e6)
+    uut.optimize_schedule()
+
+    assert all(set(r) == set(ref) for r, ref in zip(season_instance.schedule, reference))
+
+
+def test_score_cache_doesnt_change_the_result(season_instance):
+    schedule = [list(r) for r in season_instance.schedule]
+    random.seed(1)
+    expected = Optimizer(season_instance).optimize_schedule()
+    season_instance.schedule = schedule
+    random.seed(1)
+    uut = Optimizer(season_instance, score_cache=ScoreCache())
+
+    assert uut.optimize_schedule() == pytest.approx(expected)
+    assert uut.score_cache.hits > 0
@@ -0,0 +1,72 @@
+import json
+import random
+
+import pytest
+
+from matchscheduler.optimizer import Optimizer
+from matchscheduler.optimizer_stats import (
+    INTRA_ROUND_SWAP,
+    MATCH_SWAP,
+    PLAYERS_SWAP,
+    OptimizerStats,
+)
+from matchscheduler.scoring_algorithm import ScoringAlgorithm
+from matchscheduler.season import Season
+
+
+@pytest.fixture()
+def season_instance():
+    random.seed(0)
+    return Season.create_from_settings(
+        {
+            "calendar": {"title": "Tennisabo", "time_start": "19:00", "time_end": "21:00"},
+            "abo": {
+                "start": "2024-01-01",
+                "end": "2024-04-29",
+                "excluded_dates": [],
+                "overall_cost": 1000,
+                "number_courts": 2,
+            },
+            "players": [
+                {"name": "Max", "cannot_play": ["2024-01-01"], "weight": 1},
+                {"name": "Peter", "cannot_play": [], "weight": 1},
+                {"name": "Ida", "cannot_play": [], "weight": 2},
+                {"name": "Franz", "cannot_play": ["2024-02-05"], "weight": 1},
+                {"name": "Helmut", "cannot_play": [], "weight": 1},
+                {"name": "Jens", "cannot_play": [], "weight": 1},
+            ],
+        }
+    )
+
+
+def test_get_pass_starts_an_iteration():
+    uut = OptimizerStats()
+    uut.get_pass(MATCH_SWAP).tried += 1
+
+    assert len(uut.iterations) == 1
+    assert uut.get_totals()[MATCH_SWAP].tried == 1
+
+
+def test_acceptance_rate_is_zero_without_evaluated_moves():
+    assert OptimizerStats().get_pass(PLAYERS_SWAP).acceptance_rate == 0
+
+
+def test_optimizer_records_stats_per_iteration(season_instance, tmp_path):
+    path = tmp_path / "stats.jsonl"
+    uut = Optimizer(season_instance, stats_path=path)
+    score = uut.optimize_schedule()
+
+    assert uut.stats.iterations[-1].score == score
+    for iteration in uut.stats.iterations:
+        for stats in iteration.passes.values():
+            assert stats.tried == stats.invalid + stats.evaluated
+            assert stats.evaluated >= stats.accepted
+    totals = uut.stats.get_totals()
+    assert totals[PLAYERS_SWAP].accepted + totals[INTRA_ROUND_SWAP].accepted > 0
+    assert totals[MATCH_SWAP].evaluated > 0
+
+    lines = [json.loads(line) for line in path.read_text(encoding="utf-8").splitlines()]
+    assert [line["iteration"] for line in lines] == list(range(1, len(uut.stats.iterations) + 1))
+    assert lines[-1]["score"] == pytest.approx(
+        ScoringAlgorithm().get_score(season_instance.schedule, season_instance.players)
+    )
@@ -0,0 +1,37 @@
+from itertools import combinations
+
+import pytest
+
+from matchscheduler.incremental_scorer import get_pair_index
+from matchscheduler.match import create_match
+from matchscheduler.pair_table import PairTable
+
+
+@pytest.fixture()
+def table():
+    return PairTable(5)
+
+
+def test_pair_ids_are_pair_indizes(table):
+    for p, q in combinations(range(5), 2):
+        assert table.get_id(create_match(p, q)) == get_pair_index(p, q, 5)
+    assert table.get_id(create_match(2, None)) == table.num_pairs + 2
+
+
+def test_get_match_is_like_create_match_without_allocating(table):
+    assert table.get_match(3, 1) == create_match(3, 1)
+    assert table.get_match(3, 1) is table.get_match(1, 3)
+    assert table.get_match(4, None) == create_match(4, None)
+    with pytest.raises(ValueError):
+        table.get_match(2, 2)
+
+
+def test_players_of_ids(table):
+    assert table.players[table.get_id((1, 4))] == (1, 4)
+    assert table.players[table.get_id((1, None))] == (1,)
+
+
+def test_replace_player(table):
+    assert table.replace_player((1, 4), 4, 0) == (0, 1)
+    assert table.replace_player((1, None), 1, 2) == (2, None)
+    assert table.replace_player((1, 4), 3, 0) == (1, 4)
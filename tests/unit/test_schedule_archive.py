@@ -0,0 +1,96 @@
+import json
+from datetime import date
+
+import pytest
+
+from matchscheduler.match import create_match
+from matchscheduler.schedule_archive import ScheduleArchive, get_schedule_hash
+from matchscheduler.scoring_algorithm import ScoringAlgorithm
+from matchscheduler.season import Season
+
+
+@pytest.fixture()
+def season_instance():
+    return Season.from_dict(
+        json.loads(
+            '{"players": [{"name": "Max", "cannot_play": [], "weight": 1}, {"name": "Peter", "cannot_play": [], "weight": 1}, {"name": "Ida", "cannot_play": [], "weight": 1}, {"name": "Franz", "cannot_play": [], "weight": 1}, {"name": "Helmut", "cannot_play": [], "weight": 1}], "start": "2024-01-01", "end": "2024-01-15", "number_courts": 2, "time_start": "19:00:00", "time_end": "21:00:00", "excluded_dates": [], "overall_cost": 300, "calendar_title": "Tennisabo", "schedule": [[[0, 1], [2, 3]], [[0, 4], [1, 2]], [[1, 3], [2, 4]]]}'  # noqa: E501
+        )
+    )
+
+
+def other_schedules(season):
+    """Get schedules which differ from the season in the first round."""
+    for p, q in [(0, 4), (1, 4), (3, 4)]:
+        schedule = [list(r) for r in season.schedule]
+        schedule[0][0] = create_match(p, q)
+        yield schedule
+
+
+def test_schedule_hash_ignores_order_of_matches():
+    assert get_schedule_hash([[(0, 1), (2, 3)]]) == get_schedule_hash([[(2, 3), (0, 1)]])
+    assert get_schedule_hash([[(0, 1), (2, 3)]]) != get_schedule_hash([[(0, 2), (1, 3)]])
+
+
+def test_add_drops_duplicates(season_instance):
+    uut = ScheduleArchive(season_instance)
+
+    assert uut.add(season_instance.schedule)
+    assert not uut.add([list(reversed(r)) for r in season_instance.schedule])
+    assert len(uut) == 1
+
+
+def test_add_keeps_best_size_schedules(season_instance):
+    uut = ScheduleArchive(season_instance, size=2)
+    scores = [3.0, 1.0, 2.0, 4.0]
+    schedules = [season_instance.schedule, *other_schedules(season_instance)]
+
+    added = [uut.add(s, score) for s, score in zip(schedules, scores)]
+
+    assert added == [True, True, True, False]
+    assert [e.score for e in uut.entries] == [1.0, 2.0]
+    # an evicted schedule can be added again
+    assert uut.add(season_instance.schedule, 0.5)
+
+
+def test_components_sum_up_to_the_score(season_instance):
+    uut = ScheduleArchive(season_instance)
+    uut.add(season_instance.schedule)
+
+    entry = uut.entries[0]
+    assert entry.score == pytest.approx(
+        ScoringAlgorithm().get_score(season_instance.schedule, season_instance.players)
+    )
+    assert sum(entry.components.values()) == pytest.approx(entry.score)
+
+
+def test_best_returns_best_entry_matching_the_query(season_instance):
+    uut = ScheduleArchive(season_instance)
+    uut.add(season_instance.schedule, 1.0)
+    for score, schedule in enumerate(other_schedules(season_instance), start=2):
+        uut.add(schedule, score)
+    start, end = date(2024, 1, 1), date(2024, 1, 1)
+
+    # Max only plays on 2024-01-01 in the first two schedules
+    entry = uut.best(lambda e: e.get_times_playing(0, start, end) == 0)
+
+    assert entry is not None and entry.score == 3
+    assert uut.best(lambda e: e.get_times_playing(0, start, end) > 1) is None
+    assert uut.get_times_playing(0, start, end).tolist() == [1, 1, 0, 0]
+    assert uut.get_times_playing(4, start, date(2024, 1, 15)).tolist() == [2, 3, 3, 3]
+
+
+def test_to_dict_and_from_dict(season_instance):
+    uut = ScheduleArchive(season_instance, size=3)
+    uut.add(season_instance.schedule)
+    for schedule in other_schedules(season_instance):
+        uut.add(schedule)
+
+    restored = ScheduleArchive.from_dict(json.loads(json.dumps(uut.to_dict())), season_instance)
+
+    assert [e.hash for e in restored.entries] == [e.hash for e in uut.entries]
+    assert [e.score for e in restored.entries] == [e.score for e in uut.entries]
+
+
+def test_size_must_be_positive(season_instance):
+    with pytest.raises(ValueError):
+        ScheduleArchive(season_instance, size=0)
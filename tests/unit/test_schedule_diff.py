@@ -0,0 +1,48 @@
+import json
+from datetime import date
+
+import pytest
+
+from matchscheduler.match import create_match
+from matchscheduler.schedule_diff import DeviationPenalty, diff, format_changes
+from matchscheduler.season import Season
+
+
+@pytest.fixture()
+def season_instance():
+    return Season.from_dict(
+        json.loads(
+            '{"players": [{"name": "Max", "cannot_play": [], "weight": 1}, {"name": "Peter", "cannot_play": [], "weight": 1}, {"name": "Ida", "cannot_play": [], "weight": 1}, {"name": "Franz", "cannot_play": [], "weight": 1}, {"name": "Helmut", "cannot_play": [], "weight": 1}], "start": "2024-01-01", "end": "2024-01-15", "number_courts": 2, "time_start": "19:00:00", "time_end": "21:00:00", "excluded_dates": [], "overall_cost": 300, "calendar_title": "Tennisabo", "schedule": [[[0, 1], [2, 3]], [[0, 4], [1, 2]], [[1, 3], [2, 4]]]}'  # noqa: E501
+        )
+    )
+
+
+def test_diff_is_empty_for_equal_schedules(season_instance):
+    assert not diff(season_instance, season_instance)
+
+
+def test_diff_reports_dates_and_opponents(season_instance):
+    other = Season.from_dict(season_instance.to_dict())
+    # Helmut plays instead of Max on 2024-01-01
+    other.schedule[0][0] = create_match(1, 4)
+
+    changes = diff(season_instance, other)
+
+    assert sorted(changes) == [0, 1, 4]
+    assert changes[0].removed_dates == [date(2024, 1, 1)]
+    assert changes[4].added_dates == [date(2024, 1, 1)]
+    assert changes[1].changed_opponents == [(date(2024, 1, 1), 0, 4)]
+    assert format_changes(changes, other).splitlines()[1] == "Peter: 2024-01-01: Max -> Helmut"
+
+
+def test_deviation_penalty_counts_matches_not_in_the_reference_round(season_instance):
+    reference = [list(r) for r in season_instance.schedule]
+    uut = DeviationPenalty(reference, weight=2)
+    schedule = [list(r) for r in reference]
+    # the order inside a round is free
+    schedule[0].reverse()
+    move = ((1, 0, create_match(3, 4)),)
+
+    assert uut.get_value(schedule) == 0
+    assert uut.get_move_delta(schedule, move) == 2
+    assert list(uut.get_slot_deltas(1, schedule[1][0], [create_match(3, 4), (0, 4)])) == [2, 0]
@@ -0,0 +1,66 @@
+import random
+
+import pytest
+
+from matchscheduler.match import create_match
+from matchscheduler.player import Player
+from matchscheduler.score_cache import CachedScoringAlgorithm, ScoreCache
+from matchscheduler.scoring_algorithm import ScoringAlgorithm
+
+
+@pytest.fixture()
+def schedule():
+    return [
+        [create_match(0, 1), create_match(2, 3)],
+        [create_match(0, 2), create_match(1, 3)],
+        [create_match(0, 3), create_match(1, 2)],
+    ]
+
+
+def test_hash_ignores_the_order_inside_a_round(schedule):
+    uut = ScoreCache()
+    permuted = [list(reversed(r)) for r in schedule]
+
+    assert uut.get_hash(schedule) == uut.get_hash(permuted)
+    assert uut.get_hash(schedule) != uut.get_hash(schedule[::-1])
+
+
+def test_move_hash_equals_hash_of_the_new_schedule(schedule):
+    uut = ScoreCache()
+    move = ((0, 0, create_match(0, 2)), (1, 0, create_match(0, 1)))
+    moved = [list(r) for r in schedule]
+    for round_index, match_index, match in move:
+        moved[round_index][match_index] = match
+
+    assert uut.get_move_hash(uut.get_hash(schedule), schedule, move) == uut.get_hash(moved)
+
+
+def test_keys_dont_change_the_global_random_sequence(schedule):
+    random.seed(0)
+    expected = random.random()
+    random.seed(0)
+    ScoreCache().get_hash(schedule)
+
+    assert random.random() == expected
+
+
+def test_cache_evicts_the_least_recently_used_entry():
+    uut = ScoreCache(max_size=2)
+    uut.put(1, 1.0)
+    uut.put(2, 2.0)
+    uut.get(1)
+    uut.put(3, 3.0)
+
+    assert uut.get(2) is None
+    assert uut.get(1) == 1.0
+    assert len(uut) == 2
+    assert (uut.hits, uut.misses) == (2, 1)
+
+
+def test_cached_scoring_algorithm_returns_the_same_score(schedule):
+    players = [Player(f"player{i}", [], 1) for i in range(4)]
+    uut = CachedScoringAlgorithm()
+
+    assert uut.get_score(schedule, players) == ScoringAlgorithm().get_score(schedule, players)
+    assert uut.get_score(schedule, players) == ScoringAlgorithm().get_score(schedule, players)
+    assert (uut.cache.hits, uut.cache.misses) == (1, 1)
@@ -4,7 +4,11 @@ import pytest
 
 from matchscheduler.match import create_match
 from matchscheduler.player import Player
-from matchscheduler.scoring_algorithm import ScoringAlgorithm
+from matchscheduler.scoring_algorithm import (
+    BoundScoringAlgorithm,
+    ScoringAlgorithm,
+    VectorizedScoringAlgorithm,
+)
 
 
 @pytest.fixture()
@@ -130,3 +134,61 @@ def test_schedule_even_is_worse_than_balanced(balenced_to_weight, schedule_even,
     assert uut.get_std_of_pause_between_playing(
         balenced_to_weight, player_list
     ) < uut.get_std_of_pause_between_playing(schedule_even, player_list)
+
+
+@pytest.mark.parametrize(
+    "schedule_fixture",
+    [
+        "schedule_with_one_player_not_playing",
+        "schedule_even",
+        "schedule_blocks",
+        "balenced_to_weight",
+    ],
+)
+def test_vectorized_scoring_algorithm_equals_scoring_algorithm(
+    request, schedule_fixture, player_list
+):
+    schedule = request.getfixturevalue(schedule_fixture)
+    expected = ScoringAlgorithm()
+    uut = VectorizedScoringAlgorithm()
+    for method in [
+        "get_std_of_player_times_playing",
+        "get_std_of_all_possible_matches",
+        "get_std_of_pause_between_matches",
+        "get_std_of_pause_between_playing",
+        "get_score",
+    ]:
+        assert getattr(uut, method)(schedule, player_list) == pytest.approx(
+            getattr(expected, method)(schedule, player_list)
+        )
+
+
+@pytest.mark.parametrize(
+    "schedule_fixture",
+    [
+        "schedule_with_one_player_not_playing",
+        "schedule_even",
+        "schedule_blocks",
+        "balenced_to_weight",
+    ],
+)
+def test_bound_scoring_algorithm_equals_scoring_algorithm(request, schedule_fixture, player_list):
+    schedule = request.getfixturevalue(schedule_fixture)
+    uut = BoundScoringAlgorithm(player_list)
+
+    assert uut.get_score(schedule) == pytest.approx(
+        ScoringAlgorithm().get_score(schedule, player_list)
+    )
+
+
+def test_bound_scoring_algorithm_handles_byes(player_list):
+    schedule = [[create_match(0, None)], [create_match(1, 2)], [create_match(2, None)]]
+
+    assert BoundScoringAlgorithm(player_list).get_score(schedule) == pytest.approx(
+        ScoringAlgorithm().get_score(schedule, player_list)
+    )
+
+
+def test_bound_scoring_algorithm_raises_for_other_players(player_list, schedule_even):
+    with pytest.raises(ValueError):
+        BoundScoringAlgorithm(player_list).get_score(schedule_even, list(player_list))
@@ -1,4 +1,5 @@
 import json
+import random
 from datetime import date, time
 
 import pytest
@@ -6,7 +7,7 @@ import pytest
 from matchscheduler.match import create_match
 from matchscheduler.player import Player
 from matchscheduler.round import get_players_of_round
-from matchscheduler.season import Season
+from matchscheduler.season import GREEDY_CONSTRUCTION, Season, get_round_mask
 
 
 @pytest.fixture()
@@ -187,3 +188,150 @@ def test_switch_matches_returns_false_if_fixed(
     assert not result
     assert m1 == season_with_too_less_players.schedule[round1][match1]
     assert m2 == season_with_too_less_players.schedule[round2][match2]
+
+
+def test_array_schedule_round_trip(season_with_too_less_players):
+    s = season_with_too_less_players
+    old_schedule = [list(r) for r in s.schedule]
+    s.set_array_schedule(s.to_array_schedule())
+    assert s.schedule == old_schedule
+
+
+def test_get_candidate_matches_returns_only_valid_matches(season_instance):
+    candidates = season_instance.get_candidate_matches(3, 1)
+    assert candidates
+    assert season_instance.schedule[3][1] not in candidates
+    for candidate in candidates:
+        old_match = season_instance.schedule[3][1]
+        assert season_instance.change_match(3, 1, candidate)
+        season_instance.change_match(3, 1, old_match)
+
+
+def test_get_candidate_matches_is_empty_for_fixed_rounds(season_with_too_less_players):
+    fixed = season_with_too_less_players.fixed_rounds[0]
+    assert season_with_too_less_players.get_candidate_matches(fixed, 0) == []
+
+
+def test_used_masks_follow_mutations(season_instance):
+    rng = random.Random(0)
+    for _ in range(200):
+        round_index = rng.randrange(len(season_instance.schedule))
+        candidates = season_instance.get_candidate_matches(round_index, 0)
+        if candidates:
+            season_instance.change_match(round_index, 0, rng.choice(candidates))
+        season_instance.switch_matches(
+            round_index, 1, rng.randrange(len(season_instance.schedule)), 0
+        )
+
+    assert season_instance.check_schedule_is_valid()
+    assert season_instance.used_masks == [get_round_mask(r) for r in season_instance.schedule]
+
+
+def test_assigning_schedule_rebuilds_used_masks(season_instance):
+    schedule = [list(r) for r in season_instance.schedule]
+    schedule[0] = [create_match(1, 3), create_match(2, 4)]
+    season_instance.schedule = schedule
+
+    assert season_instance.used_masks[0] == 0b11110
+
+
+def test_available_masks_exclude_players_who_cannot_play(season_instance):
+    # Max cannot play on the first two dates, Peter on the second
+    assert season_instance.available_masks[0] == 0b111110
+    assert season_instance.available_masks[1] == 0b111100
+    assert season_instance.available_players[1] == [2, 3, 4, 5]
+
+
+def test_greedy_construction_generates_valid_schedule(player_list):
+    season = Season(
+        player_list,
+        date(2024, 1, 1),
+        date(2024, 4, 29),
+        2,
+        time(19),
+        time(21),
+        [],
+        2000,
+        construction=GREEDY_CONSTRUCTION,
+    )
+
+    assert season.check_schedule_is_valid()
+
+
+def test_greedy_construction_balances_appearances():
+    players = [Player(f"player{i}", [], 1) for i in range(7)]
+    season = Season(
+        players,
+        date(2024, 1, 1),
+        date(2024, 6, 24),
+        2,
+        time(19),
+        time(21),
+        [],
+        2000,
+        construction=GREEDY_CONSTRUCTION,
+    )
+
+    appearances = [sum(p in get_players_of_round(r) for r in season.schedule) for p in range(7)]
+    assert max(appearances) - min(appearances) <= 1
+
+
+def test_init_raises_for_unknown_construction(player_list):
+    with pytest.raises(ValueError):
+        Season(
+            player_list,
+            date(2024, 1, 1),
+            date(2024, 1, 29),
+            1,
+            time(19),
+            time(21),
+            [],
+            2000,
+            construction="unknown",
+        )
+
+
+def test_apply_availability_change_returns_invalid_rounds_and_fixes_past(season_instance):
+    # Ida plays in the round of 2024-01-29
+    invalid_rounds = season_instance.apply_availability_change(
+        2, [date(2024, 1, 29)], played_until=date(2024, 1, 22)
+    )
+
+    assert invalid_rounds == [4]
+    assert not season_instance.check_if_round_is_valid(4)
+    assert season_instance.available_players[4] == [0, 1, 3, 4, 5]
+    assert sorted(season_instance.fixed_rounds) == [0, 1, 2]
+
+
+def test_fixed_rounds_survive_to_dict_and_from_dict(season_instance):
+    season_instance.apply_availability_change(2, [], played_until=date(2024, 1, 29))
+
+    uut = Season.from_dict(season_instance.to_dict())
+
+    assert uut.fixed_rounds == [0, 1, 2, 3]
+    assert uut.to_dict() == season_instance.to_dict()
+
+
+def test_apply_availability_change_makes_round_partial(season_instance):
+    # only four players are available on 2024-01-08, Jens plays there
+    invalid_rounds = season_instance.apply_availability_change(5, [date(2024, 1, 8)])
+
+    assert not invalid_rounds
+    assert season_instance.schedule[1] == [create_match(3, 4), create_match(2, None)]
+    assert season_instance.used_masks[1] == 0b11100
+    assert 1 in season_instance.fixed_rounds
+
+
+def test_init_raises_for_schedule_of_other_length(player_list):
+    with pytest.raises(ValueError):
+        Season(
+            player_list,
+            date(2024, 1, 1),
+            date(2024, 1, 29),
+            1,
+            time(19),
+            time(21),
+            [],
+            2000,
+            schedule=[[create_match(2, 3)]],
+        )
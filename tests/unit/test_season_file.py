@@ -0,0 +1,62 @@
+import json
+import random
+from datetime import date, time
+
+import numpy as np
+import pytest
+
+from matchscheduler.player import Player
+from matchscheduler.season import Season
+from matchscheduler.season_file import load_header, load_season, open_schedule, save_season
+
+
+@pytest.fixture()
+def season_instance():
+    # the first two rounds are partial, the first one with a bye
+    players = [
+        Player("Max", ["2024-01-01", "2024-01-08"], 1),
+        Player("Peter", ["2024-01-08"], 1),
+        Player("Ida", [], 2),
+        Player("Moritz", [], 1),
+        Player("Franz", [], 1),
+    ]
+    return Season(players, date(2024, 1, 1), date(2024, 2, 26), 2, time(19), time(21), [], 100)
+
+
+def test_load_season_restores_the_season(season_instance, tmp_path):
+    season_instance.fixed_rounds.append(5)
+    save_season(season_instance, tmp_path / "season.bin")
+
+    uut = load_season(tmp_path / "season.bin")
+
+    assert uut.schedule == season_instance.schedule
+    assert uut.to_dict() == season_instance.to_dict()
+    assert uut.fixed_rounds == sorted(season_instance.fixed_rounds)
+    assert uut.used_masks == season_instance.used_masks
+
+
+def test_load_season_doesnt_construct_a_schedule(season_instance, tmp_path):
+    save_season(season_instance, tmp_path / "season.bin")
+    random.seed(0)
+    expected = random.random()
+    random.seed(0)
+    load_season(tmp_path / "season.bin")
+
+    assert random.random() == expected
+
+
+def test_open_schedule_maps_the_array_schedule(season_instance, tmp_path):
+    save_season(season_instance, tmp_path / "season.bin")
+
+    uut = open_schedule(tmp_path / "season.bin")
+
+    assert isinstance(uut, np.memmap)
+    assert uut.offset % 8 == 0
+    assert np.array_equal(uut, season_instance.to_array_schedule().matches)
+
+
+def test_load_header_raises_for_other_files(tmp_path):
+    (tmp_path / "season.json").write_text(json.dumps({"a": 1}) + " " * 20)
+
+    with pytest.raises(ValueError):
+        load_header(tmp_path / "season.json")
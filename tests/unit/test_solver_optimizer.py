@@ -0,0 +1,82 @@
+import random
+
+import pytest
+
+from matchscheduler.player import Player
+from matchscheduler.scoring_algorithm import ScoringAlgorithm, get_std_of_pause
+from matchscheduler.season import Season
+
+pytest.importorskip("ortools")
+
+from matchscheduler.solver_optimizer import (  # noqa: E402
+    OPTIMAL,
+    SolverOptimizer,
+    get_min_std_of_pause,
+)
+
+
+@pytest.fixture()
+def season_instance():
+    random.seed(0)
+    return Season.create_from_settings(
+        {
+            "calendar": {"title": "Tennisabo", "time_start": "19:00", "time_end": "21:00"},
+            "abo": {
+                "start": "2024-01-01",
+                "end": "2024-02-19",
+                "excluded_dates": [],
+                "overall_cost": 1000,
+                "number_courts": 1,
+            },
+            "players": [
+                {"name": "Max", "cannot_play": ["2024-01-01"], "weight": 1},
+                {"name": "Peter", "cannot_play": [], "weight": 1},
+                {"name": "Ida", "cannot_play": [], "weight": 2},
+                {"name": "Franz", "cannot_play": [], "weight": 1},
+            ],
+        }
+    )
+
+
+@pytest.mark.parametrize("count", [0, 1, 2, 3, 5, 8])
+def test_get_min_std_of_pause_is_a_lower_bound(count):
+    rng = random.Random(count)
+    for _ in range(20):
+        rounds = sorted(rng.sample(range(12), count))
+        assert get_min_std_of_pause(count, 12) <= get_std_of_pause(rounds, 12) + 1e-9
+
+
+def test_get_min_std_of_pause_is_reached_for_even_pauses():
+    assert get_min_std_of_pause(3, 12) == pytest.approx(get_std_of_pause([3, 6, 9], 12))
+
+
+def test_optimize_schedule_certifies_bound(season_instance):
+    start_score = ScoringAlgorithm().get_score(season_instance.schedule, season_instance.players)
+    uut = SolverOptimizer(season_instance, max_seconds=20, solver_name="CBC")
+    score = uut.optimize_schedule()
+
+    assert season_instance.check_schedule_is_valid()
+    assert score == ScoringAlgorithm().get_score(season_instance.schedule, season_instance.players)
+    assert score <= start_score
+    assert uut.stop_reason == OPTIMAL
+    assert 0 <= uut.lower_bound <= score
+    assert uut.gap == pytest.approx((score - uut.lower_bound) / score)
+
+
+def test_lower_bound_holds_for_other_schedules(season_instance):
+    uut = SolverOptimizer(season_instance, max_seconds=20, solver_name="CBC")
+    uut.optimize_schedule()
+
+    for seed in range(5):
+        random.seed(seed)
+        other = Season(
+            [Player("Max", ["2024-01-01"], 1)]
+            + [Player(name, [], w) for name, w in [("Peter", 1), ("Ida", 2), ("Franz", 1)]],
+            season_instance.start,
+            season_instance.end,
+            1,
+            season_instance.time_start,
+            season_instance.time_end,
+            [],
+        )
+        assert uut.lower_bound <= ScoringAlgorithm().get_score(other.schedule, other.players)
@@ -0,0 +1,60 @@
+import random
+from datetime import date, time
+
+import pytest
+
+from matchscheduler.match import create_match
+from matchscheduler.optimizer import Optimizer
+from matchscheduler.player import Player
+from matchscheduler.scoring_algorithm import ScoringAlgorithm
+from matchscheduler.season import Season
+from matchscheduler.tabu_optimizer import TabuList, TabuOptimizer
+
+
+@pytest.fixture()
+def season_instance():
+    random.seed(0)
+    player_list = [
+        Player("Max", ["2024-01-01", "2024-01-08"], 1),
+        Player("Peter", ["2024-01-08"], 1),
+        Player("Ida", [], 2),
+        Player("Franz", [], 1),
+        Player("Helmut", [], 1),
+        Player("Jens", [], 1),
+    ]
+    return Season(player_list, date(2024, 1, 1), date(2024, 3, 25), 2, time(19), time(21), [], 100)
+
+
+def test_tabu_list_forgets_after_tenure():
+    uut = TabuList(2)
+    placement = (0, 1, create_match(1, 2))
+    uut.add(placement)
+    assert uut.is_tabu((placement,))
+    assert not uut.is_tabu(((0, 1, create_match(1, 3)),))
+    uut.add((1, 0, create_match(1, 3)))
+    assert uut.is_tabu((placement,))
+    uut.add((2, 0, create_match(1, 3)))
+    assert not uut.is_tabu((placement,))
+
+
+def test_tabu_list_keeps_placements_added_twice():
+    uut = TabuList(2)
+    placement = (0, 1, create_match(1, 2))
+    uut.add(placement)
+    uut.add(placement)
+    uut.add((1, 0, create_match(1, 3)))
+    assert uut.is_tabu((placement,))
+
+
+def test_optimize_schedule_is_at_least_as_good_as_greedy(season_instance):
+    schedule = [list(r) for r in season_instance.schedule]
+    random.seed(1)
+    greedy_score = Optimizer(season_instance).optimize_schedule()
+    season_instance.schedule = schedule
+    random.seed(1)
+
+    uut = TabuOptimizer(season_instance, max_iterations=20, rng=random.Random(1))
+    score = uut.optimize_schedule()
+    assert score <= greedy_score
+    assert score == ScoringAlgorithm().get_score(season_instance.schedule, season_instance.players)
+    assert season_instance.check_schedule_is_valid()